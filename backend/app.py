@@ -14,13 +14,19 @@ import os
 from routes.documents import documents_bp
 from routes.search import search_bp
 from routes.analytics import analytics_bp
+from routes.graph import graph_bp
+from routes.entities import entities_bp
+
+from utils.profiling import init_profiling
 
 # Import configuration
-from config import DEBUG, UPLOAD_FOLDER
+from config import DEBUG, UPLOAD_FOLDER, MAX_UPLOAD_SIZE
 
 # Create Flask application
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_SIZE
 CORS(app)
+init_profiling(app)
 
 # Ensure upload directory exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -29,6 +35,12 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.register_blueprint(documents_bp)
 app.register_blueprint(search_bp)
 app.register_blueprint(analytics_bp)
+app.register_blueprint(graph_bp)
+app.register_blueprint(entities_bp)
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    return {"error": f"File exceeds the {MAX_UPLOAD_SIZE // (1024 * 1024)} MB upload limit"}, 413
 
 @app.route('/health', methods=['GET'])
 def health_check():
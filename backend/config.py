@@ -2,11 +2,123 @@ import os
 
 # Application settings
 DEBUG = True
-UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
+# Root for all data directories; overridable so tools can run against a scratch corpus
+DATA_DIRECTORY = os.environ.get("DATA_DIRECTORY", os.path.dirname(os.path.dirname(__file__)))
+UPLOAD_FOLDER = os.path.join(DATA_DIRECTORY, 'uploads')
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'docx', 'txt'}
 
+# Document store settings
+DOCUMENT_STORE_DIRECTORY = os.path.join(DATA_DIRECTORY, 'document_store')
+
+# Entity index settings
+ENTITY_INDEX_DIRECTORY = os.path.join(DATA_DIRECTORY, 'entity_index')
+ENTITY_INDEX_COMPACT_EVERY = 1000  # journal entries before the index is rewritten as a snapshot
+
 # Vector DB settings
-CHROMA_PERSIST_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'chroma_db')
+CHROMA_PERSIST_DIRECTORY = os.path.join(DATA_DIRECTORY, 'chroma_db')
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# "sentence-transformers", or "hash" for a lightweight offline stand-in used by load tests
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "sentence-transformers")
+HASH_EMBEDDING_DIM = 384
+# Identifies the vectors produced, for pipeline versions and snapshot compatibility
+EMBEDDING_ID = EMBEDDING_MODEL if EMBEDDING_BACKEND == "sentence-transformers" else f"hash-{HASH_EMBEDDING_DIM}"
 
 # NLP settings
-NLP_MODEL = "en_core_web_md"
\ No newline at end of file
+NLP_MODEL = "en_core_web_md"
+
+# Pipeline stage versions, recorded on every document.
+# Bump a stage when its code or model changes so reprocessing picks it up.
+PIPELINE_VERSIONS = {
+    "extraction": "1",
+    "classification": "1",
+    "metadata": f"3:{NLP_MODEL}",
+    "summary": f"1:{NLP_MODEL}",
+    "embedding": f"1:{EMBEDDING_ID}"
+}
+
+# Extraction changes that only affect one file format. A document's extraction
+# version is the base version plus its format's entry, so bumping one format
+# only makes documents of that format stale.
+EXTRACTION_FORMAT_VERSIONS = {
+    "docx": "2",  # streaming reader, includes tables
+    "pdf": "2"  # pages without a text layer are OCR'd
+}
+
+# Reprocessing settings
+REPROCESS_WORKERS = 4
+
+# Similarity graph settings
+SIMILARITY_GRAPH_K = 10
+SIMILARITY_BLOCK_SIZE = 1024
+CLUSTER_SIMILARITY_THRESHOLD = 0.5
+
+# Analytics settings
+RELATIONSHIP_GRAPH_MAX_LIMIT = 20  # related documents per relationship graph; bounds the cached variants
+DOCUMENT_PAGE_MAX = 500  # documents per page of the /documents listing
+
+# Snapshot settings
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_BATCH_SIZE = 1000
+
+# Ingestion admission control
+MAX_UPLOAD_SIZE = 100 * 1024 * 1024  # bytes; larger uploads get 413
+INGEST_MAX_ACTIVE = 4  # uploads processed at once
+INGEST_MAX_WAITING = 16  # uploads allowed to queue before returning 429
+INGEST_QUEUE_TIMEOUT = 60  # seconds a queued upload waits before returning 429
+INGEST_RETRY_AFTER = 10  # seconds suggested in the Retry-After header
+STAGE_CONCURRENCY = {
+    "ocr": 2,
+    "nlp": 2,
+    "embedding": 2
+}
+
+# Per-document processing budgets; stages that run out degrade instead of failing
+STAGE_TIME_BUDGETS = {
+    "extraction": 120,  # seconds
+    "metadata": 30,
+    "summary": 10
+}
+DOCUMENT_TIME_BUDGET = 180  # seconds across all stages
+PDF_MAX_OCR_PAGES = 50  # text-less PDF pages OCR'd per document
+OCR_MAX_PIXELS = 25_000_000  # larger images are downscaled before OCR
+OCR_DPI = 150
+
+# Windowed extraction for long texts
+WINDOWED_EXTRACTION = True  # walk the full text of documents longer than one window
+EXTRACTION_WINDOW_CHARS = 10000
+EXTRACTION_WINDOW_OVERLAP = 500
+NER_PROCESSES = 2  # worker processes for nlp.pipe in windowed mode, for callers passing n_process=None (never the server)
+NER_PARALLEL_MIN_WINDOWS = 8  # shorter texts run NER in-process rather than starting workers
+NER_BATCH_SIZE = 4  # windows per nlp.pipe batch
+
+# Response encoding
+COMPRESS_RESPONSES = True
+COMPRESSION_MIN_BYTES = 8192  # smaller responses are sent uncompressed
+COMPRESSION_LEVEL = 6
+
+# Date normalization
+DATE_ORDER = "MDY"  # how ambiguous numeric dates like 3/4/22 are read: "MDY" or "DMY"
+
+# Request profiling
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_HEADER = "X-Profile"  # requests sending this header with value 1 are profiled
+PROFILING_SAMPLE_RATE = 0.0  # fraction of all other requests profiled
+PROFILING_DIRECTORY = os.path.join(DATA_DIRECTORY, 'profiles')
+PROFILING_MAX_BYTES = 200 * 1024 * 1024  # oldest profiles are deleted beyond this
+
+# Vector partitioning
+VECTOR_PARTITIONING = "none"  # "none": one collection; "doc_type": one collection per document type
+VECTOR_FANOUT_WORKERS = 8  # threads querying partitions in parallel
+
+# Vector index. The distance, M and construction_ef are fixed when a collection is
+# created; run scripts/rebuild_vectors.py after changing them. Use scripts/hnsw_tune.py
+# to measure the recall/latency trade-off on the current corpus.
+VECTOR_DISTANCE = "cosine"  # "cosine", "l2" or "ip"
+HNSW_M = 16  # graph neighbors per vector; higher improves recall at the cost of memory and build time
+HNSW_CONSTRUCTION_EF = 100  # candidate list size while building the graph
+HNSW_SEARCH_EF = 100  # candidate list size while querying; higher improves recall at the cost of latency
+
+# Bulk ingestion
+BULK_INGEST_WORKERS = os.cpu_count() or 4
+BULK_EMBED_BATCH_SIZE = 256  # documents per embedding/vector store call
+BULK_INGEST_CHECKPOINT_DIRECTORY = os.path.join(DATA_DIRECTORY, 'bulk_ingest')
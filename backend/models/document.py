@@ -1,7 +1,13 @@
 from datetime import datetime
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.json_utils import JSONFragment, dumps
 
 class Document:
-    def __init__(self, id, filename, filepath, doc_type, metadata, summary, text, vector_id=None):
+    def __init__(self, id, filename, filepath, doc_type, metadata, summary, text, vector_id=None,
+                 pipeline_versions=None, created_at=None, degradations=None, source="upload"):
         self.id = id
         self.filename = filename
         self.filepath = filepath
@@ -10,9 +16,49 @@ class Document:
         self.summary = summary
         self.text = text
         self.vector_id = vector_id
-        self.created_at = datetime.now().isoformat()
+        self.pipeline_versions = pipeline_versions or {}
+        self.degradations = degradations or []
+        # "upload": the file is a copy owned by the app; "bulk": indexed in place, owned by the user
+        self.source = source
+        self.created_at = created_at or datetime.now().isoformat()
+    
+    def __setattr__(self, name, value):
+        # Any field change invalidates the cached serialized forms
+        if not name.startswith("_"):
+            self.__dict__["_json_cache"] = {}
+        object.__setattr__(self, name, value)
+    
+    def to_json(self, include_text=True):
+        """Serialized to_dict() output, cached until the document changes"""
+        # Bound once: if a field changes mid-serialization, the possibly stale
+        # result lands in the discarded cache rather than the fresh one
+        cache = self._json_cache
+        cached = cache.get(include_text)
+        if cached is None:
+            cached = JSONFragment(dumps(self.to_dict(include_text=include_text)))
+            cache[include_text] = cached
+        return cached
+    
+    def to_dict(self, include_text=True):
+        data = {
+            "id": self.id,
+            "filename": self.filename,
+            "filepath": self.filepath,
+            "type": self.type,
+            "metadata": self.metadata,
+            "summary": self.summary,
+            "vector_id": self.vector_id,
+            "pipeline_versions": self.pipeline_versions,
+            "degradations": self.degradations,
+            "source": self.source,
+            "created_at": self.created_at
+        }
+        if include_text:
+            data["text"] = self.text[:1000] + "..." if len(self.text) > 1000 else self.text
+        return data
     
-    def to_dict(self):
+    def to_record(self):
+        """Full representation used for persistence, including the complete extracted text"""
         return {
             "id": self.id,
             "filename": self.filename,
@@ -20,7 +66,27 @@ class Document:
             "type": self.type,
             "metadata": self.metadata,
             "summary": self.summary,
-            "text": self.text[:1000] + "..." if len(self.text) > 1000 else self.text,
+            "text": self.text,
             "vector_id": self.vector_id,
+            "pipeline_versions": self.pipeline_versions,
+            "degradations": self.degradations,
+            "source": self.source,
             "created_at": self.created_at
         }
+    
+    @classmethod
+    def from_record(cls, record):
+        return cls(
+            id=record["id"],
+            filename=record["filename"],
+            filepath=record["filepath"],
+            doc_type=record["type"],
+            metadata=record["metadata"],
+            summary=record["summary"],
+            text=record["text"],
+            vector_id=record.get("vector_id"),
+            pipeline_versions=record.get("pipeline_versions"),
+            created_at=record.get("created_at"),
+            degradations=record.get("degradations"),
+            source=record.get("source", "upload")
+        )
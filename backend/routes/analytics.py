@@ -1,9 +1,11 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, Response
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import RELATIONSHIP_GRAPH_MAX_LIMIT
 from services.analytics import get_document_type_stats, get_entity_distribution, get_keyword_frequency, get_document_stats
+from services.analytics import get_dashboard, get_wordcloud_png, get_relationship_graph
 
 analytics_bp = Blueprint('analytics', __name__)
 
@@ -25,4 +27,35 @@ def keyword_frequency():
 @analytics_bp.route('/analytics/document-stats', methods=['GET'])
 def document_stats():
     stats = get_document_stats()
-    return jsonify(stats), 200
\ No newline at end of file
+    return jsonify(stats), 200
+
+@analytics_bp.route('/analytics/dashboard', methods=['GET'])
+def dashboard():
+    return jsonify(get_dashboard()), 200
+
+@analytics_bp.route('/analytics/wordcloud.png', methods=['GET'])
+def wordcloud():
+    png, version = get_wordcloud_png()
+    if png is None:
+        return jsonify({"error": "No keywords available"}), 404
+    
+    etag = f'"{version}"'
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304)
+    
+    response = Response(png, mimetype='image/png')
+    response.headers['ETag'] = etag
+    return response
+
+@analytics_bp.route('/analytics/relationship-graph/<int:doc_id>', methods=['GET'])
+def relationship_graph(doc_id):
+    # Every distinct limit is cached separately, so keep the range small
+    limit = request.args.get('limit', type=int) if 'limit' in request.args else 5
+    if limit is None or not 1 <= limit <= RELATIONSHIP_GRAPH_MAX_LIMIT:
+        return jsonify({"error": f"limit must be an integer between 1 and {RELATIONSHIP_GRAPH_MAX_LIMIT}"}), 400
+    
+    graph = get_relationship_graph(doc_id, limit=limit)
+    if graph is None:
+        return jsonify({"error": "Document not found"}), 404
+    
+    return jsonify(graph), 200
\ No newline at end of file
@@ -1,10 +1,16 @@
 from flask import Blueprint, request, jsonify
+from datetime import date
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services.document_service import process_document, get_document, get_all_documents, delete_document
+from services.document_service import process_document, get_document, get_all_documents, delete_document, get_corpus_version, PIPELINE_STAGES
+from services.document_service import get_documents_in_date_range
+from services.admission import ingestion_gate, AdmissionRejected
+from services.reprocessing import start_reprocess_job, get_reprocess_job, get_pipeline_status
 from utils.file_utils import allowed_file, save_file
+from utils.json_utils import json_response
+from config import REPROCESS_WORKERS, DOCUMENT_PAGE_MAX
 
 documents_bp = Blueprint('documents', __name__)
 
@@ -19,16 +25,22 @@ def upload_file():
     
     if file and allowed_file(file.filename):
         try:
-            # Save the file
-            filepath, filename = save_file(file)
-            
-            # Process the document
-            document = process_document(filepath, filename)
+            # Wait for a processing slot, or reject if the queue is full
+            with ingestion_gate.admit():
+                # Save the file
+                filepath, filename = save_file(file)
+                
+                # Process the document
+                document = process_document(filepath, filename)
             
             return jsonify({
                 "success": True,
                 "document": document.to_dict()
             }), 200
+        except AdmissionRejected as e:
+            response = jsonify({"error": str(e)})
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 429
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
@@ -36,10 +48,41 @@ def upload_file():
 
 @documents_bp.route('/documents', methods=['GET'])
 def get_documents():
-    documents = get_all_documents()
-    return jsonify({
-        "documents": [doc.to_dict() for doc in documents]
-    }), 200
+    include_text = request.args.get('include_text', 'true').lower() != 'false'
+    date_from = request.args.get('date_from')
+    date_to = request.args.get('date_to')
+    
+    # Paged only when a limit is given; without one the whole listing is returned
+    limit = request.args.get('limit', type=int)
+    offset = request.args.get('offset', type=int) if 'offset' in request.args else 0
+    if 'limit' in request.args and (limit is None or not 1 <= limit <= DOCUMENT_PAGE_MAX):
+        return jsonify({"error": f"limit must be an integer between 1 and {DOCUMENT_PAGE_MAX}"}), 400
+    if offset is None or offset < 0:
+        return jsonify({"error": "offset must be a non-negative integer"}), 400
+    
+    if date_from or date_to:
+        try:
+            # Normalize to YYYY-MM-DD, the form the date index is sorted on
+            date_from = date.fromisoformat(date_from).isoformat() if date_from else None
+            date_to = date.fromisoformat(date_to).isoformat() if date_to else None
+        except ValueError:
+            return jsonify({"error": "date_from and date_to must be ISO dates (YYYY-MM-DD)"}), 400
+        documents = get_documents_in_date_range(date_from, date_to)
+    else:
+        documents = get_all_documents()
+    
+    total = len(documents)
+    if limit is not None:
+        documents = documents[offset:offset + limit]
+    return json_response({
+        "documents": [doc.to_json(include_text=include_text) for doc in documents],
+        "total": total,
+        "version": get_corpus_version()
+    })
+
+@documents_bp.route('/documents/version', methods=['GET'])
+def get_documents_version():
+    return jsonify({"version": get_corpus_version()}), 200
 
 @documents_bp.route('/documents/<int:doc_id>', methods=['GET'])
 def get_single_document(doc_id):
@@ -47,8 +90,19 @@ def get_single_document(doc_id):
     if not document:
         return jsonify({"error": "Document not found"}), 404
     
+    return json_response({
+        "document": document.to_json()
+    })
+
+@documents_bp.route('/documents/<int:doc_id>/text', methods=['GET'])
+def get_document_text(doc_id):
+    document = get_document(doc_id)
+    if not document:
+        return jsonify({"error": "Document not found"}), 404
+    
     return jsonify({
-        "document": document.to_dict()
+        "id": document.id,
+        "text": document.text
     }), 200
 
 @documents_bp.route('/documents/<int:doc_id>', methods=['DELETE'])
@@ -60,4 +114,40 @@ def remove_document(doc_id):
     return jsonify({
         "success": True,
         "message": f"Document {doc_id} deleted successfully"
-    }), 200
\ No newline at end of file
+    }), 200
+
+@documents_bp.route('/reprocess', methods=['POST'])
+def start_reprocess():
+    options = request.get_json(silent=True) or {}
+    stages = options.get("stages")
+    if stages is not None and not (isinstance(stages, list) and all(isinstance(s, str) for s in stages)):
+        return jsonify({"error": "stages must be a list of stage names"}), 400
+    if stages is not None and not set(stages) <= set(PIPELINE_STAGES):
+        return jsonify({"error": f"Unknown stage; expected any of {PIPELINE_STAGES}"}), 400
+    
+    workers = options.get("workers", REPROCESS_WORKERS)
+    if isinstance(workers, bool) or not isinstance(workers, int) or workers < 1:
+        return jsonify({"error": "workers must be a positive integer"}), 400
+    
+    job, started = start_reprocess_job(stages=stages, workers=workers)
+    if not started:
+        return jsonify({"error": "A reprocess job is already running", "job": job.to_dict()}), 409
+    
+    return jsonify({"job": job.to_dict()}), 202
+
+@documents_bp.route('/reprocess', methods=['GET'])
+def reprocess_status():
+    job = get_reprocess_job()
+    return jsonify({
+        "job": job.to_dict() if job else None,
+        "pipeline": get_pipeline_status()
+    }), 200
+
+@documents_bp.route('/reprocess', methods=['DELETE'])
+def cancel_reprocess():
+    job = get_reprocess_job()
+    if not job or not job.is_running():
+        return jsonify({"error": "No reprocess job is running"}), 404
+    
+    job.cancel()
+    return jsonify({"job": job.to_dict()}), 200
\ No newline at end of file
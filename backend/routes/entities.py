@@ -0,0 +1,45 @@
+from flask import Blueprint, request, jsonify
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.document_service import search_entities, get_documents_for_entity
+from utils.json_utils import json_response
+
+entities_bp = Blueprint('entities', __name__)
+
+def _pagination():
+    limit = min(int(request.args.get('limit', 50)), 500)
+    offset = max(int(request.args.get('offset', 0)), 0)
+    return limit, offset
+
+@entities_bp.route('/entities', methods=['GET'])
+def list_entities():
+    entity_type = request.args.get('type')
+    prefix = request.args.get('prefix')
+    limit, offset = _pagination()
+    
+    entities, total = search_entities(entity_type=entity_type, prefix=prefix, limit=limit, offset=offset)
+    
+    return jsonify({
+        "entities": entities,
+        "total": total,
+        "limit": limit,
+        "offset": offset
+    }), 200
+
+@entities_bp.route('/entities/<entity_type>/<path:text>/documents', methods=['GET'])
+def entity_documents(entity_type, text):
+    limit, offset = _pagination()
+    
+    result = get_documents_for_entity(entity_type, text, limit=limit, offset=offset)
+    if result is None:
+        return jsonify({"error": "Entity not found"}), 404
+    
+    documents, total = result
+    return json_response({
+        "documents": [doc.to_json(include_text=False) for doc in documents],
+        "total": total,
+        "limit": limit,
+        "offset": offset
+    })
@@ -0,0 +1,29 @@
+from flask import Blueprint, request, jsonify
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SIMILARITY_GRAPH_K
+from services.similarity_graph import similarity_graph
+
+graph_bp = Blueprint('graph', __name__)
+
+@graph_bp.route('/graph', methods=['GET'])
+def get_graph():
+    k = request.args.get('k', type=int)
+    if 'k' in request.args and (k is None or not 1 <= k <= SIMILARITY_GRAPH_K):
+        return jsonify({"error": f"k must be an integer between 1 and {SIMILARITY_GRAPH_K}"}), 400
+    min_similarity = request.args.get('min_similarity', type=float)
+    if 'min_similarity' in request.args and min_similarity is None:
+        return jsonify({"error": "min_similarity must be a number"}), 400
+    
+    return jsonify(similarity_graph.get_graph(k=k, min_similarity=min_similarity)), 200
+
+@graph_bp.route('/clusters', methods=['GET'])
+def get_clusters():
+    return jsonify(similarity_graph.get_clusters()), 200
+
+@graph_bp.route('/graph/rebuild', methods=['POST'])
+def rebuild_graph():
+    version = similarity_graph.refresh(force=True)[0]
+    return jsonify({"success": True, "version": version}), 200
@@ -3,7 +3,8 @@ import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services.document_service import search_documents, find_related_documents
+from services.document_service import search_document_hits, find_related_hits
+from utils.json_utils import json_response
 
 search_bp = Blueprint('search', __name__)
 
@@ -14,17 +15,22 @@ def search():
         return jsonify({"results": []}), 200
     
     limit = int(request.args.get('limit', 10))
+    doc_type = request.args.get('type')
     
-    results = search_documents(query, limit=limit)
+    hits = search_document_hits(query, limit=limit, doc_type=doc_type)
     
-    return jsonify({"results": results}), 200
+    return json_response({
+        "results": [{"document": doc.to_json(), "similarity": similarity} for doc, similarity in hits]
+    })
 
 @search_bp.route('/related/<int:doc_id>', methods=['GET'])
 def find_related(doc_id):
     limit = int(request.args.get('limit', 5))
     
-    related = find_related_documents(doc_id, limit=limit)
-    if related is None:
+    hits = find_related_hits(doc_id, limit=limit)
+    if hits is None:
         return jsonify({"error": "Document not found"}), 404
     
-    return jsonify({"related": related}), 200
\ No newline at end of file
+    return json_response({
+        "related": [{"document": doc.to_json(), "similarity": similarity} for doc, similarity in hits]
+    })
\ No newline at end of file
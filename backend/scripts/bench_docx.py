@@ -0,0 +1,135 @@
+"""
+Compare the streaming DOCX reader against python-docx.
+
+Usage (from the backend directory):
+    python scripts/bench_docx.py [file.docx ...] [--paragraphs 50000] [--rows 5000] [--repeat 3]
+
+Without files, a synthetic document with the given number of paragraphs and
+table rows is generated. Each reader runs in its own subprocess so peak RSS
+is measured separately; python-docx allocates through lxml, which tracemalloc
+cannot see.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+
+def _paragraph(text):
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+def write_synthetic_docx(path, paragraphs, rows):
+    """An invoice-like document: body paragraphs followed by a line-item table"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        archive.writestr("_rels/.rels", RELS)
+        with archive.open("word/document.xml", 'w') as f:
+            f.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>')
+            for i in range(paragraphs):
+                f.write(_paragraph(f"Paragraph {i}: the supplier agrees to deliver the goods "
+                                   f"listed below by the agreed date.").encode("utf-8"))
+            f.write(b'<w:tbl>')
+            for i in range(rows):
+                cells = [f"Item {i}", str(i % 7 + 1), f"${i % 100}.00"]
+                f.write(('<w:tr>' + "".join(f'<w:tc>{_paragraph(c)}</w:tc>' for c in cells)
+                         + '</w:tr>').encode("utf-8"))
+            f.write(b'</w:tbl>' + _paragraph("Total due: see above").encode("utf-8"))
+            f.write(b'</w:body></w:document>')
+
+def _read_streaming(path):
+    from utils.docx_reader import extract_docx_text
+    return extract_docx_text(path)
+
+def _read_python_docx(path):
+    # The previous extract_text implementation: paragraphs only, no tables
+    import docx
+    doc = docx.Document(path)
+    return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+
+READERS = {"streaming": _read_streaming, "python-docx": _read_python_docx}
+
+def run_reader(name, path):
+    """Child process entry point: read once and report time, output size and peak RSS"""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    text = READERS[name](path)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": seconds, "chars": len(text), "rss_growth_kb": peak - baseline}))
+
+def measure(name, path, repeat):
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name, path],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1]}
+        runs.append(json.loads(result.stdout))
+    best = min(runs, key=lambda run: run["seconds"])
+    return {
+        "seconds": best["seconds"],
+        "chars": best["chars"],
+        "rss_growth_kb": max(run["rss_growth_kb"] for run in runs)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOCX text extraction")
+    parser.add_argument("files", nargs="*", help="DOCX files to read (default: a synthetic document)")
+    parser.add_argument("--paragraphs", type=int, default=50000)
+    parser.add_argument("--rows", type=int, default=5000, help="Table rows in the synthetic document")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per reader; the fastest is reported")
+    parser.add_argument("--child", nargs=2, metavar=("READER", "FILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_reader(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files
+        if not files:
+            path = os.path.join(tmp, "synthetic.docx")
+            write_synthetic_docx(path, args.paragraphs, args.rows)
+            files = [path]
+
+        for path in files:
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            print(f"{os.path.basename(path)} ({size_mb:.1f} MB compressed)")
+            results = {name: measure(name, path, args.repeat) for name in READERS}
+            for name, result in results.items():
+                if "error" in result:
+                    print(f"  {name:12} {result['error']}")
+                else:
+                    print(f"  {name:12} {result['seconds']:8.3f}s  {result['chars']:>10} chars  "
+                          f"peak RSS +{result['rss_growth_kb'] / 1024:.1f} MB")
+            if all("error" not in result for result in results.values()):
+                speedup = results["python-docx"]["seconds"] / results["streaming"]["seconds"]
+                print(f"  streaming is {speedup:.1f}x faster")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+Measure HNSW recall@k and query latency against exact brute-force search.
+
+Usage (from the backend directory):
+    python scripts/hnsw_tune.py --m 8,16,32 --construction-ef 100,200 --search-ef 10,50,100,200
+    python scripts/hnsw_tune.py --synthetic 50000 --dim 384 --k 10
+
+By default the corpus is the embeddings already stored in the vector store;
+--synthetic generates clustered unit vectors instead. A random sample of the
+corpus is held out as queries, exact neighbors are computed with NumPy, and
+every combination of M, construction_ef and search_ef is built in a scratch
+Chroma instance and queried one request at a time. The fastest setting that
+reaches --target-recall is suggested for config.py.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+from chromadb.api.client import SharedSystemClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import VECTOR_DISTANCE
+from services.vector_store import VectorStore, hnsw_metadata, set_search_ef
+
+def parse_ints(value):
+    return [int(part) for part in value.split(",") if part]
+
+def stored_embeddings():
+    vector_store = VectorStore()
+    vector_ids, _ = vector_store.get_vector_ids()
+    return vector_store.get_embeddings(vector_ids)
+
+def synthetic_embeddings(count, dim, seed):
+    """Unit vectors scattered around a few hundred centers, roughly like topic clusters"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, count // 200), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def exact_neighbors(queries, corpus, k, space, block_size=1024):
+    """Row indices of the true top-k corpus vectors for each query under the given distance"""
+    if space == "cosine":
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        corpus = corpus / np.maximum(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12)
+    squared_norms = (corpus ** 2).sum(axis=1)
+
+    neighbors = []
+    for start in range(0, len(queries), block_size):
+        scores = queries[start:start + block_size] @ corpus.T
+        if space == "l2":
+            # Rank by -|c|^2 + 2 q.c, which orders like -|q - c|^2
+            scores = 2 * scores - squared_norms
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        neighbors.append(np.take_along_axis(top, order, axis=1))
+    return np.vstack(neighbors)
+
+def brute_force_latency(queries, corpus, k, space):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        exact_neighbors(query[None, :], corpus, k, space)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def build_collection(client, name, corpus, space, m, construction_ef, search_ef, batch_size=5000):
+    collection = client.create_collection(name=name, metadata=hnsw_metadata(space, m, construction_ef, search_ef))
+    for start in range(0, len(corpus), batch_size):
+        collection.add(
+            ids=[str(i) for i in range(start, min(start + batch_size, len(corpus)))],
+            embeddings=corpus[start:start + batch_size]
+        )
+    return collection
+
+def reopen(directory, name):
+    """
+    A fresh handle on a collection. Chroma reads ef_search when it loads an
+    index, so changing it only shows up once the client is recreated.
+    """
+    SharedSystemClient.clear_system_cache()
+    client = chromadb.PersistentClient(path=directory)
+    return client, client.get_collection(name)
+
+def measure(collection, queries, truth, k):
+    """Recall@k and per-query latencies for single-query requests"""
+    # Warm up so the index is loaded before timing
+    collection.query(query_embeddings=queries[:1], n_results=k)
+
+    hits = 0
+    timings = []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=query[None, :], n_results=k, include=[])
+        timings.append(time.perf_counter() - start)
+        hits += len(set(int(id) for id in result['ids'][0]) & set(expected.tolist()))
+    return hits / (len(queries) * k), timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure HNSW recall and latency trade-offs")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use this many synthetic vectors instead of the stored corpus")
+    parser.add_argument("--dim", type=int, default=384, help="Dimension of synthetic vectors")
+    parser.add_argument("--space", default=VECTOR_DISTANCE, choices=["cosine", "l2", "ip"])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200, help="Corpus vectors held out as queries")
+    parser.add_argument("--m", type=parse_ints, default=[8, 16, 32])
+    parser.add_argument("--construction-ef", type=parse_ints, default=[100, 200])
+    parser.add_argument("--search-ef", type=parse_ints, default=[10, 50, 100, 200])
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    vectors = synthetic_embeddings(args.synthetic, args.dim, args.seed) if args.synthetic else stored_embeddings()
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) <= args.queries + args.k:
+        print(f"Error: need more than {args.queries + args.k} vectors, found {len(vectors)}")
+        sys.exit(1)
+
+    rng = np.random.default_rng(args.seed)
+    held_out = np.zeros(len(vectors), dtype=bool)
+    held_out[rng.choice(len(vectors), args.queries, replace=False)] = True
+    queries, corpus = vectors[held_out], vectors[~held_out]
+    print(f"{len(corpus)} vectors of dimension {corpus.shape[1]}, {len(queries)} queries, "
+          f"{args.space} distance, k={args.k}")
+
+    truth = exact_neighbors(queries, corpus, args.k, args.space)
+    exact_timings = brute_force_latency(queries, corpus, args.k, args.space)
+    print(f"Brute force: p50 {percentile(exact_timings, 50) * 1000:.2f} ms, "
+          f"p95 {percentile(exact_timings, 95) * 1000:.2f} ms")
+
+    print(f"{'M':>4} {'build_ef':>8} {'search_ef':>9} {'build s':>8} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    results = []
+    directory = tempfile.mkdtemp(prefix="hnsw_tune_")
+    try:
+        client = chromadb.PersistentClient(path=directory)
+        for m in args.m:
+            for construction_ef in args.construction_ef:
+                name = f"tune_m{m}_c{construction_ef}"
+                collection = None
+                for search_ef in args.search_ef:
+                    if collection is not None and set_search_ef(collection, search_ef):
+                        client, collection = reopen(directory, name)
+                    else:
+                        # ef_search is fixed at creation on older Chroma, so build once per value there
+                        if collection is not None:
+                            client.delete_collection(name)
+                        start = time.perf_counter()
+                        collection = build_collection(client, name, corpus, args.space, m, construction_ef, search_ef)
+                        build_seconds = time.perf_counter() - start
+
+                    recall, timings = measure(collection, queries, truth, args.k)
+                    result = {
+                        "M": m,
+                        "construction_ef": construction_ef,
+                        "search_ef": search_ef,
+                        "build_seconds": build_seconds,
+                        "recall": recall,
+                        "p50_ms": percentile(timings, 50) * 1000,
+                        "p95_ms": percentile(timings, 95) * 1000
+                    }
+                    results.append(result)
+                    print(f"{m:>4} {construction_ef:>8} {search_ef:>9} {build_seconds:>8.1f} {recall:>7.3f} "
+                          f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}")
+                client.delete_collection(name)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    good = [result for result in results if result["recall"] >= args.target_recall]
+    if good:
+        best = min(good, key=lambda result: result["p95_ms"])
+        print(f"\nFastest setting with recall >= {args.target_recall}: "
+              f"HNSW_M = {best['M']}, HNSW_CONSTRUCTION_EF = {best['construction_ef']}, "
+              f"HNSW_SEARCH_EF = {best['search_ef']}")
+    else:
+        print(f"\nNo setting reached recall {args.target_recall}; try larger M or search_ef")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                "corpus_size": len(corpus),
+                "dimension": int(corpus.shape[1]),
+                "space": args.space,
+                "k": args.k,
+                "brute_force_p50_ms": percentile(exact_timings, 50) * 1000,
+                "brute_force_p95_ms": percentile(exact_timings, 95) * 1000,
+                "results": results
+            }, f, indent=2)
+
+if __name__ == '__main__':
+    main()
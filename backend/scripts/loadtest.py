@@ -0,0 +1,320 @@
+"""
+Drive the HTTP API with a concurrent mix of uploads, searches, related,
+listing and analytics calls, and report per-endpoint latency.
+
+Usage (from the backend directory):
+    python scripts/loadtest.py --concurrency 8 --duration 60
+    python scripts/loadtest.py --mix upload=1,search=6,related=2,analytics=1 --compare ../loadtest_results/previous.json
+    python scripts/loadtest.py --url http://127.0.0.1:5000  # against an already running server
+
+Without --url a local server is started on a scratch data directory with
+the hash embedding backend, and the corpus is synthetic, so the run needs
+no network or embedding model. Results are saved as JSON under --output,
+by default loadtest_results/ in the data directory.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BACKEND_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIRECTORY)
+from config import DATA_DIRECTORY
+
+OPERATIONS = ["upload", "search", "related", "documents", "analytics"]
+DEFAULT_MIX = "upload=1,search=5,related=2,documents=1,analytics=1"
+
+# Synthetic corpus building blocks, one template per document type the classifier knows
+NAMES = ["Alice Morgan", "Bob Chen", "Carla Diaz", "David Okafor", "Eva Novak", "Farid Haddad"]
+COMPANIES = ["Acme Corp", "Globex Ltd", "Initech", "Umbrella Health", "Stark Legal LLP", "Wayne Finance"]
+CITIES = ["Boston", "Denver", "London", "Toronto", "Berlin", "Sydney"]
+FILLER = ("The parties reviewed the schedule and agreed to revisit the remaining items. "
+          "Further details are available from the accounts department on request. ")
+TEMPLATES = [
+    "Invoice No: INV-{n}\nBill to: {company}, {city}\nDate: {date}\nServices rendered by {name}.\n"
+    "Total amount due: ${amount}\nPayment terms: 30 days. Tax included.\n",
+    "Service Agreement\nThis contract is made between {company} and {name}.\nEffective date: {month} {day}, {year}\n"
+    "The parties hereby agree to the terms and obligations set out below, signed {date} in {city}.\n",
+    "Patient: {name}\nDate of visit: {date}\nDiagnosis: seasonal influenza\nTreatment: rest and fluids\n"
+    "Medication: oseltamivir 75mg\nDoctor at {company}, {city}.\n",
+    "In the District Court of {city}\nCase No: CV-{n}\n{name}, Plaintiff, v. {company}, Defendant.\n"
+    "The attorney for the plaintiff filed on {date}. The judge set a hearing.\n",
+    "Resume of {name}\nObjective: senior analyst role\nExperience: {company}, {city}\n"
+    "Skills: Python, SQL, reporting\nEducation: BSc Economics\n",
+]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+          "October", "November", "December"]
+QUERIES = ["invoice total amount due", "service agreement obligations", "patient diagnosis treatment",
+           "court case plaintiff defendant", "analyst resume python skills", "payment terms tax",
+           "hearing date attorney", "medication prescribed"]
+
+def synthetic_document(rng):
+    """A short synthetic document with entities, dates and amounts"""
+    month = rng.randint(1, 12)
+    day = rng.randint(1, 28)
+    year = rng.randint(2018, 2025)
+    text = rng.choice(TEMPLATES).format(
+        n=rng.randint(1000, 99999),
+        name=rng.choice(NAMES),
+        company=rng.choice(COMPANIES),
+        city=rng.choice(CITIES),
+        date=f"{month}/{day}/{year}",
+        month=MONTHS[month - 1],
+        day=day,
+        year=year,
+        amount=f"{rng.randint(100, 99999):,}.{rng.randint(0, 99):02d}"
+    )
+    return text + FILLER * rng.randint(1, 20)
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    unknown = set(weights) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations in mix: {', '.join(sorted(unknown))}")
+    return weights
+
+class Client:
+    """Minimal stdlib HTTP client, so the harness has no extra dependencies"""
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, method, path, body=None, headers=None):
+        req = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers or {})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def upload(self, filename, text):
+        boundary = uuid.uuid4().hex
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+                f"Content-Type: text/plain\r\n\r\n{text}\r\n--{boundary}--\r\n").encode("utf-8")
+        return self.request("POST", "/upload", body, {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+
+class LoadTest:
+    def __init__(self, client, weights, seed=0):
+        self.client = client
+        self.weights = weights
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.doc_ids = []
+        self.samples = []
+        self.samples_lock = threading.Lock()
+
+    def _random(self, fn, *args):
+        with self.rng_lock:
+            return fn(*args)
+
+    def _record(self, operation, started, status):
+        elapsed = time.perf_counter() - started
+        with self.samples_lock:
+            self.samples.append((operation, elapsed, status))
+
+    def do_upload(self):
+        text = self._random(synthetic_document, self.rng)
+        status, body = self.client.upload(f"loadtest_{uuid.uuid4().hex}.txt", text)
+        if status == 200:
+            doc_id = json.loads(body)["document"]["id"]
+            with self.samples_lock:
+                self.doc_ids.append(doc_id)
+        return status
+
+    def do_search(self):
+        query = self._random(self.rng.choice, QUERIES)
+        return self.client.request("GET", "/search?" + urllib.parse.urlencode({"q": query}))[0]
+
+    def do_related(self):
+        with self.samples_lock:
+            if not self.doc_ids:
+                return None
+            doc_id = self._random(self.rng.choice, self.doc_ids)
+        return self.client.request("GET", f"/related/{doc_id}")[0]
+
+    def do_documents(self):
+        return self.client.request("GET", "/documents?include_text=false")[0]
+
+    def do_analytics(self):
+        return self.client.request("GET", "/analytics/dashboard")[0]
+
+    def run_operation(self, operation):
+        started = time.perf_counter()
+        try:
+            status = getattr(self, f"do_{operation}")()
+        except Exception:
+            status = "exception"
+        if status is not None:
+            self._record(operation, started, status)
+
+    def seed(self, count, concurrency):
+        """Upload the initial synthetic corpus; these uploads are not part of the results"""
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda _: self.do_upload(), range(count)))
+
+    def run(self, concurrency, duration):
+        operations = list(self.weights)
+        weights = [self.weights[op] for op in operations]
+        deadline = time.monotonic() + duration
+
+        def worker():
+            while time.monotonic() < deadline:
+                operation = self._random(self.rng.choices, operations, weights)[0]
+                self.run_operation(operation)
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - started
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+def summarize(samples, elapsed):
+    by_operation = {}
+    for operation, latency, status in samples:
+        by_operation.setdefault(operation, []).append((latency, status))
+
+    summary = {}
+    for operation, results in sorted(by_operation.items()):
+        latencies = sorted(latency for latency, _ in results)
+        rejected = sum(1 for _, status in results if status == 429)
+        errors = sum(1 for _, status in results if status != 429 and not (isinstance(status, int) and status < 400))
+        summary[operation] = {
+            "requests": len(results),
+            "throughput_rps": len(results) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": latencies[-1] * 1000,
+            "error_rate": errors / len(results),
+            "rejected_rate": rejected / len(results)
+        }
+    return summary
+
+def print_report(summary, elapsed, baseline=None):
+    total = sum(stats["requests"] for stats in summary.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)\n")
+    header = f"{'endpoint':<10} {'reqs':>6} {'rps':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'429s':>6}"
+    print(header)
+    print("-" * len(header))
+    for operation, stats in summary.items():
+        print(f"{operation:<10} {stats['requests']:>6} {stats['throughput_rps']:>7.1f} {stats['p50_ms']:>9.1f} "
+              f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['error_rate']:>7.1%} {stats['rejected_rate']:>6.1%}")
+        if baseline and operation in baseline:
+            before = baseline[operation]
+            print(f"{'  vs base':<10} {'':>6} {stats['throughput_rps'] - before['throughput_rps']:>+7.1f} "
+                  f"{stats['p50_ms'] - before['p50_ms']:>+9.1f} {stats['p95_ms'] - before['p95_ms']:>+9.1f} "
+                  f"{stats['p99_ms'] - before['p99_ms']:>+9.1f}")
+
+def start_local_server(port, data_directory):
+    """Start the app on a scratch data directory with the offline hash embedding backend"""
+    env = dict(os.environ, DATA_DIRECTORY=data_directory, EMBEDDING_BACKEND="hash")
+    # The server logs every request to stderr; a file never fills up and stalls it like an unread pipe would
+    log_path = os.path.join(data_directory, "server.log")
+    with open(log_path, 'wb') as log:
+        server = subprocess.Popen(
+            [sys.executable, "-c", f"from app import app; app.run(port={port}, debug=False, threaded=True)"],
+            cwd=BACKEND_DIRECTORY, env=env, stdout=subprocess.DEVNULL, stderr=log
+        )
+    client = Client(f"http://127.0.0.1:{port}", timeout=5)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+                raise RuntimeError("Server exited during startup:\n" + f.read())
+        try:
+            if client.request("GET", "/health")[0] == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("Server did not become healthy within 120s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test of the document API")
+    parser.add_argument("--url", help="Base URL of a running server; a local one is started if omitted")
+    parser.add_argument("--port", type=int, default=5055, help="Port for the local server")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of mixed traffic")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted operations (default {DEFAULT_MIX})")
+    parser.add_argument("--corpus-size", type=int, default=50, help="Synthetic documents uploaded before the run")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(DATA_DIRECTORY, "loadtest_results"))
+    parser.add_argument("--compare", help="Earlier results file to print deltas against")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    server = None
+    scratch = None
+    base_url = args.url
+    if not base_url:
+        scratch = tempfile.TemporaryDirectory(prefix="loadtest_")
+        print(f"Starting local server on port {args.port} (data in {scratch.name})")
+        server = start_local_server(args.port, scratch.name)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        test = LoadTest(Client(base_url, args.timeout), weights, seed=args.seed)
+        print(f"Seeding {args.corpus_size} synthetic documents")
+        test.seed(args.corpus_size, args.concurrency)
+        print(f"Running {args.concurrency} workers for {args.duration:.0f}s with mix {args.mix}")
+        elapsed = test.run(args.concurrency, args.duration)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        if scratch:
+            scratch.cleanup()
+
+    summary = summarize(test.samples, elapsed)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["endpoints"]
+    print_report(summary, elapsed, baseline)
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "config": {
+                "url": args.url or "local",
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "mix": weights,
+                "corpus_size": args.corpus_size
+            },
+            "elapsed_seconds": elapsed,
+            "endpoints": summary
+        }, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Rebuild vector collections with the configured distance and HNSW parameters.
+
+Usage (from the backend directory, with the API server stopped):
+    python scripts/rebuild_vectors.py [--check] [--all]
+
+Collections created with other settings, including ones created before
+VECTOR_DISTANCE and the HNSW_* values were configurable, are copied from
+their stored embeddings into a fresh index. No text is re-embedded.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.vector_store import VectorStore, index_settings
+
+def print_progress(done, total):
+    print(f"\r  [{done}/{total}]", end="", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild vector collections with the configured index settings")
+    parser.add_argument("--check", action="store_true", help="Only list collections that need a rebuild")
+    parser.add_argument("--all", action="store_true", help="Rebuild every collection, even up-to-date ones")
+    args = parser.parse_args()
+
+    vector_store = VectorStore()
+    names = list(vector_store._collections) if args.all else vector_store.stale_collections()
+    for name in names:
+        settings = index_settings(vector_store._collections[name])
+        print(f"{name}: {settings}")
+    if not names:
+        print("All collections match the configured index settings")
+    if args.check:
+        sys.exit(1 if names else 0)
+
+    for name in names:
+        print(f"Rebuilding {name}")
+        start = time.time()
+        copied = vector_store.rebuild_collection(name, progress_callback=print_progress)
+        print(f"\n  copied {copied} vectors in {time.time() - start:.1f}s")
+
+if __name__ == '__main__':
+    main()
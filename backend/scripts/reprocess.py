@@ -0,0 +1,56 @@
+"""
+Re-run stale pipeline stages over the stored corpus.
+
+Usage (from the backend directory, with the API server stopped):
+    python scripts/reprocess.py [--stages metadata summary] [--workers 8]
+
+Progress is checkpointed per document through its pipeline version stamps,
+so an interrupted run resumes where it stopped when started again.
+
+The script rewrites the document store directly. A running server keeps its
+own in-memory copy of every document and would overwrite these changes the
+next time it saves one, so stop it first, or use POST /reprocess instead.
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import REPROCESS_WORKERS
+from services.document_service import PIPELINE_STAGES
+from services.reprocessing import ReprocessJob, get_pipeline_status
+
+def print_progress(job):
+    done = job.completed + job.failed
+    print(f"\r[{done}/{job.total}] completed={job.completed} failed={job.failed}", end="", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprocess stale documents")
+    parser.add_argument("--stages", nargs="+", choices=PIPELINE_STAGES,
+                        help="Force these stages on every document instead of only stale ones")
+    parser.add_argument("--workers", type=int, default=REPROCESS_WORKERS)
+    parser.add_argument("--status", action="store_true", help="Only report stale stage counts")
+    args = parser.parse_args()
+    
+    status = get_pipeline_status()
+    print(f"{status['total_documents']} documents, stale stages: {status['stale_stages'] or 'none'}")
+    if args.status:
+        return
+    
+    job = ReprocessJob(stages=args.stages, workers=args.workers, progress_callback=print_progress)
+    try:
+        job.run()
+    except KeyboardInterrupt:
+        job.cancel()
+        print("\nInterrupted; completed documents keep their new versions. Run again to resume.")
+        sys.exit(1)
+    
+    print()
+    result = job.to_dict()
+    print(f"{result['status']}: {result['completed']} reprocessed, {result['failed']} failed "
+          f"in {result['elapsed_seconds']:.1f}s")
+    for doc_id, error in result["errors"].items():
+        print(f"  document {doc_id}: {error}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Export or import a corpus snapshot including stored embeddings.
+
+Usage (from the backend directory):
+    python scripts/snapshot.py export /path/to/snapshot
+    python scripts/snapshot.py import /path/to/snapshot [--force]    # with the API server stopped
+
+Importing bulk-loads the stored vectors, so restore time is bounded by disk
+throughput rather than OCR, spaCy or embedding inference.
+
+Import writes the document store, vector store and entity index directly. A
+server running on the same data directory keeps its own in-memory documents,
+date index and entity index, which would not see the import and would
+overwrite it, so stop the server before importing and start it afterwards.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.snapshot import export_snapshot, import_snapshot
+
+def print_progress(done, total):
+    print(f"\r[{done}/{total}]", end="", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import a corpus snapshot")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="Snapshot directory")
+    parser.add_argument("--force", action="store_true",
+                        help="Import even if the snapshot was made with a different embedding model")
+    args = parser.parse_args()
+
+    start = time.time()
+    if args.command == "export":
+        manifest = export_snapshot(args.path, progress_callback=print_progress)
+        count = manifest["document_count"]
+    else:
+        try:
+            count = import_snapshot(args.path, force=args.force, progress_callback=print_progress)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    elapsed = time.time() - start
+    print(f"\n{args.command}ed {count} documents in {elapsed:.1f}s")
+
+if __name__ == '__main__':
+    main()
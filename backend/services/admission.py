@@ -0,0 +1,105 @@
+import sys
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (INGEST_MAX_ACTIVE, INGEST_MAX_WAITING, INGEST_QUEUE_TIMEOUT, INGEST_RETRY_AFTER,
+                    STAGE_CONCURRENCY, STAGE_TIME_BUDGETS, DOCUMENT_TIME_BUDGET)
+
+class AdmissionRejected(Exception):
+    """Raised when the ingestion queue is full"""
+
+    def __init__(self, retry_after):
+        super().__init__("Server is busy processing other documents")
+        self.retry_after = retry_after
+
+class AdmissionGate:
+    """
+    Limits how many uploads are processed at once, with a bounded wait queue.
+    Requests beyond the queue are rejected immediately instead of piling up.
+    """
+
+    def __init__(self, max_active=INGEST_MAX_ACTIVE, max_waiting=INGEST_MAX_WAITING,
+                 timeout=INGEST_QUEUE_TIMEOUT, retry_after=INGEST_RETRY_AFTER):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def admit(self):
+        with self._condition:
+            if self.active >= self.max_active:
+                if self.waiting >= self.max_waiting:
+                    raise AdmissionRejected(self.retry_after)
+                self.waiting += 1
+                try:
+                    admitted = self._condition.wait_for(lambda: self.active < self.max_active, self.timeout)
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    raise AdmissionRejected(self.retry_after)
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.active -= 1
+                self._condition.notify()
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_active": self.max_active,
+            "max_waiting": self.max_waiting
+        }
+
+ingestion_gate = AdmissionGate()
+
+# Concurrency limits for the heavy stages
+_stage_semaphores = {stage: threading.BoundedSemaphore(limit) for stage, limit in STAGE_CONCURRENCY.items()}
+
+@contextmanager
+def stage_slot(stage):
+    """Hold one of the limited concurrency slots of a heavy stage (ocr, nlp, embedding)"""
+    semaphore = _stage_semaphores[stage]
+    with semaphore:
+        yield
+
+class ProcessingBudget:
+    """
+    Per-document time budgets for the pipeline stages.
+    Stages check their remaining time, degrade when it runs out and record
+    what they skipped so it is visible on the document.
+    """
+
+    def __init__(self, stage_budgets=STAGE_TIME_BUDGETS, total_budget=DOCUMENT_TIME_BUDGET):
+        self.stage_budgets = stage_budgets
+        self.total_budget = total_budget
+        self.started_at = time.monotonic()
+        self.degradations = []
+        self._stage_started = {}
+
+    def start(self, stage):
+        self._stage_started[stage] = time.monotonic()
+
+    def remaining(self, stage):
+        """Seconds left for the stage, also bounded by the document's total budget"""
+        now = time.monotonic()
+        total_left = self.total_budget - (now - self.started_at)
+        if stage not in self.stage_budgets:
+            return total_left
+        stage_left = self.stage_budgets[stage] - (now - self._stage_started.get(stage, now))
+        return min(stage_left, total_left)
+
+    def exhausted(self, stage):
+        return self.remaining(stage) <= 0
+
+    def record(self, stage, reason, **detail):
+        self.degradations.append(dict(detail, stage=stage, reason=reason))
@@ -1,9 +1,39 @@
 from collections import Counter
+from io import BytesIO
+import base64
+import threading
 import sys
 import os
 
+import networkx as nx
+from wordcloud import WordCloud
+
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services.document_service import get_all_documents
+from services.document_service import get_all_documents, get_document, get_corpus_version, find_related_documents
+
+# Computed artifacts, valid for a single corpus version
+_artifact_cache = {}
+_artifact_version = None
+_artifact_lock = threading.Lock()
+
+def _cached_artifact(key, compute):
+    """Return a cached artifact for the current corpus version, computing it if needed"""
+    global _artifact_version
+    
+    version = get_corpus_version()
+    with _artifact_lock:
+        if _artifact_version != version:
+            _artifact_cache.clear()
+            _artifact_version = version
+        if key in _artifact_cache:
+            return _artifact_cache[key], version
+    
+    # Compute outside the lock; a concurrent duplicate computation is harmless
+    value = compute()
+    with _artifact_lock:
+        if _artifact_version == version:
+            _artifact_cache[key] = value
+    return value, version
 
 def get_document_type_stats():
     """Get distribution of document types"""
@@ -67,4 +97,78 @@ def get_document_stats():
         "total_documents": len(documents),
         "document_types": dict(doc_types),
         "entity_types": dict(entity_types)
-    }
\ No newline at end of file
+    }
+
+def _render_wordcloud():
+    keywords = []
+    for doc in get_all_documents():
+        keywords.extend(doc.metadata.get("key_terms", []))
+    if not keywords:
+        return None
+    
+    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(" ".join(keywords))
+    buffer = BytesIO()
+    wordcloud.to_image().save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def get_wordcloud_png():
+    """
+    Get the keyword cloud as PNG bytes for the current corpus version.
+    Returns (png_bytes or None, version).
+    """
+    return _cached_artifact("wordcloud", _render_wordcloud)
+
+def get_dashboard():
+    """
+    Get every dashboard artifact in one payload, cached per corpus version.
+    Only aggregates are included, so the payload does not grow with the corpus.
+    """
+    def compute():
+        documents = get_all_documents()
+        png, _ = get_wordcloud_png()
+        return {
+            "total_documents": len(documents),
+            "document_types": get_document_type_stats(),
+            "entity_distribution": get_entity_distribution(),
+            "keyword_frequency": get_keyword_frequency(),
+            "wordcloud_png": base64.b64encode(png).decode("ascii") if png else None
+        }
+    
+    dashboard, version = _cached_artifact("dashboard", compute)
+    return dict(dashboard, version=version)
+
+def get_relationship_graph(doc_id, limit=5):
+    """
+    Get the relationship graph around a document with a precomputed layout.
+    Returns None if the document does not exist.
+    """
+    def compute():
+        doc = get_document(doc_id)
+        if not doc:
+            return None
+        
+        graph = nx.Graph()
+        graph.add_node(doc.id, filename=doc.filename, type=doc.type)
+        edges = []
+        for rel in find_related_documents(doc_id, limit=limit):
+            rel_doc = rel["document"]
+            graph.add_node(rel_doc["id"], filename=rel_doc["filename"], type=rel_doc["type"])
+            graph.add_edge(doc.id, rel_doc["id"], weight=rel["similarity"])
+            edges.append({"source": doc.id, "target": rel_doc["id"], "similarity": rel["similarity"]})
+        
+        # Fixed seed so the layout is stable between requests
+        pos = nx.spring_layout(graph, seed=42)
+        nodes = [{
+            "id": node,
+            "filename": data["filename"],
+            "type": data["type"],
+            "x": float(pos[node][0]),
+            "y": float(pos[node][1])
+        } for node, data in graph.nodes(data=True)]
+        
+        return {"center": doc.id, "nodes": nodes, "edges": edges}
+    
+    graph, version = _cached_artifact(("relationship-graph", doc_id, limit), compute)
+    if graph is None:
+        return None
+    return dict(graph, version=version)
\ No newline at end of file
@@ -0,0 +1,272 @@
+import sys
+import os
+import json
+import hashlib
+import multiprocessing
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import BULK_INGEST_WORKERS, BULK_EMBED_BATCH_SIZE, BULK_INGEST_CHECKPOINT_DIRECTORY
+from utils.file_utils import allowed_file
+
+def analyze_file(path):
+    """
+    Run extraction and the NLP stages on one file in a worker process.
+    Imported lazily so workers load spaCy but never the vector store.
+    """
+    from services.classification import classify_document
+    from services.extraction import extract_metadata, generate_summary
+    from utils.file_utils import extract_text
+
+    text = extract_text(path)
+    doc_type = classify_document(text)
+    return {
+        "text": text,
+        "type": doc_type,
+        # Already one process per file, so NER runs in-process
+        "metadata": extract_metadata(text, doc_type),
+        "summary": generate_summary(text)
+    }
+
+def find_files(root):
+    """Every ingestible file under root, in a stable order"""
+    paths = []
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            if allowed_file(filename):
+                paths.append(os.path.join(directory, filename))
+    return sorted(paths)
+
+def default_checkpoint_path(root):
+    key = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(BULK_INGEST_CHECKPOINT_DIRECTORY, f"{key}.jsonl")
+
+def load_checkpoint(path):
+    """Map of file path -> last checkpoint entry ("pending", "done" or "failed")"""
+    entries = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line from an interrupted run
+                    break
+                entries[entry["path"]] = entry
+    return entries
+
+class BulkIngest:
+    """
+    Ingests a directory tree without going through HTTP.
+    Files are analyzed in a process pool, embedded and stored in batches, and
+    every committed batch is appended to a checkpoint so an interrupted run
+    resumes with the files it had not finished.
+    Each batch is checkpointed as pending, with its document and vector IDs
+    reserved, before anything is written; a resumed run reconciles pending
+    entries so an interruption never leaves duplicates or orphaned vectors.
+    Files are indexed where they are and marked as bulk-ingested, so deleting
+    the document never deletes the file.
+    Run it while the API server is stopped, or restart the server afterwards,
+    since the server keeps its own in-memory view of the document store.
+    """
+
+    def __init__(self, root, workers=BULK_INGEST_WORKERS, batch_size=BULK_EMBED_BATCH_SIZE,
+                 checkpoint_path=None, retry_failed=False, progress_callback=None):
+        self.root = root
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path or default_checkpoint_path(root)
+        self.retry_failed = retry_failed
+        self.progress_callback = progress_callback
+        self.total = 0
+        self.skipped = 0
+        self.ingested = 0
+        self.failed = {}
+        self.types = Counter()
+        self.bytes_read = 0
+        self.elapsed = 0.0
+        self._batch = []
+
+    def _checkpoint(self, entries):
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _reconcile(self, entries):
+        """
+        Settle batches an earlier run left pending. Documents that were
+        registered count as done; vectors of the rest are removed so their
+        files can be ingested again.
+        """
+        from services.document_service import vector_store, get_document
+
+        settled = []
+        for path, entry in entries.items():
+            if entry["status"] != "pending":
+                continue
+            document = get_document(entry["doc_id"])
+            if document and document.source == "bulk" and document.filepath == os.path.abspath(path):
+                settled.append({"path": path, "status": "done", "doc_id": entry["doc_id"]})
+            else:
+                vector_store.delete_document(entry["vector_id"])
+        self._checkpoint(settled)
+        for entry in settled:
+            entries[entry["path"]] = entry
+
+    def _commit(self, batch):
+        """Embed and store a batch of analyzed files, then checkpoint it"""
+        from models.document import Document
+        from services.document_service import vector_store, allocate_id, register_document, pipeline_versions_for
+
+        doc_ids = [allocate_id() for _ in batch]
+        vector_ids = [vector_store.new_vector_id(result["type"]) for _, result in batch]
+        self._checkpoint([{"path": path, "status": "pending", "doc_id": doc_id, "vector_id": vector_id}
+                          for doc_id, vector_id, (path, _) in zip(doc_ids, vector_ids, batch)])
+
+        vector_store.add_documents(
+            doc_ids=doc_ids,
+            texts=[result["text"] for _, result in batch],
+            metadatas=[{
+                "filename": os.path.basename(path),
+                "type": result["type"],
+                "summary": result["summary"]
+            } for path, result in batch],
+            vector_ids=vector_ids
+        )
+
+        entries = []
+        for doc_id, vector_id, (path, result) in zip(doc_ids, vector_ids, batch):
+            register_document(Document(
+                id=doc_id,
+                filename=os.path.basename(path),
+                filepath=os.path.abspath(path),
+                doc_type=result["type"],
+                metadata=result["metadata"],
+                summary=result["summary"],
+                text=result["text"],
+                vector_id=vector_id,
+                pipeline_versions=pipeline_versions_for(path),
+                source="bulk"
+            ))
+            self.types[result["type"]] += 1
+            entries.append({"path": path, "status": "done", "doc_id": doc_id})
+
+        self._checkpoint(entries)
+        self.ingested += len(batch)
+
+    def _fail(self, path, error):
+        self.failed[path] = error
+        self._checkpoint([{"path": path, "status": "failed", "error": error}])
+
+    def _accept(self, path, result):
+        self._batch.append((path, result))
+        self.bytes_read += os.path.getsize(path)
+        if len(self._batch) >= self.batch_size:
+            self._commit(self._batch)
+            self._batch = []
+
+    def _run_pool(self, queue, context):
+        """
+        Analyze queued files until the queue is empty or a worker process dies.
+        Returns the files that were in flight when the pool broke, or None.
+        """
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+            in_flight = {}
+
+            def submit_next():
+                if queue:
+                    path = queue.popleft()
+                    try:
+                        in_flight[executor.submit(analyze_file, path)] = path
+                    except BrokenProcessPool:
+                        queue.appendleft(path)
+                        raise
+
+            try:
+                # Bound the number of analyzed texts held in memory at once
+                for _ in range(self.workers * 2):
+                    submit_next()
+
+                while in_flight:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        path = in_flight.pop(future)
+                        try:
+                            result = future.result()
+                        except BrokenProcessPool:
+                            return [path] + list(in_flight.values())
+                        except Exception as e:
+                            self._fail(path, f"{type(e).__name__}: {e}")
+                        else:
+                            self._accept(path, result)
+                        if self.progress_callback:
+                            self.progress_callback(self)
+                        submit_next()
+            except BrokenProcessPool:
+                return list(in_flight.values())
+        return None
+
+    def _run_isolated(self, paths, context):
+        """
+        Re-run the files that were in flight when a worker crashed, one per
+        fresh process, so only the file that actually crashes is marked failed.
+        """
+        for path in paths:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                try:
+                    result = executor.submit(analyze_file, path).result()
+                except BrokenProcessPool:
+                    self._fail(path, "BrokenProcessPool: worker process crashed")
+                    continue
+                except Exception as e:
+                    self._fail(path, f"{type(e).__name__}: {e}")
+                    continue
+            self._accept(path, result)
+
+    def run(self):
+        started = time.time()
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+
+        done = load_checkpoint(self.checkpoint_path)
+        self._reconcile(done)
+        paths = find_files(self.root)
+        self.total = len(paths)
+        pending = [path for path in paths
+                   if path not in done or done[path]["status"] == "pending"
+                   or (self.retry_failed and done[path]["status"] == "failed")]
+        self.skipped = self.total - len(pending)
+
+        # spawn keeps the parent's Chroma client and threads out of the workers
+        context = multiprocessing.get_context("spawn")
+        queue = deque(pending)
+        while True:
+            crashed = self._run_pool(queue, context)
+            if crashed is None:
+                break
+            self._run_isolated(crashed, context)
+
+        if self._batch:
+            self._commit(self._batch)
+            self._batch = []
+        self.elapsed = time.time() - started
+        return self.summary()
+
+    def summary(self):
+        processed = self.ingested + len(self.failed)
+        return {
+            "root": self.root,
+            "total_files": self.total,
+            "skipped_from_checkpoint": self.skipped,
+            "ingested": self.ingested,
+            "failed": len(self.failed),
+            "elapsed_seconds": self.elapsed,
+            "files_per_second": processed / self.elapsed if self.elapsed else 0.0,
+            "megabytes_per_second": self.bytes_read / (1024 * 1024) / self.elapsed if self.elapsed else 0.0,
+            "document_types": dict(self.types),
+            "failures": self.failed
+        }
@@ -0,0 +1,86 @@
+import sys
+import os
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DATE_ORDER
+
+NUMERIC_DATE_PATTERN = re.compile(r'^(\d{1,2})[/\-\.](\d{1,2})[/\-\.](\d{2,4})$')
+TEXTUAL_DATE_FORMATS = ["%B %d, %Y", "%B %d %Y", "%b %d, %Y", "%b %d %Y"]
+
+def normalize_date(raw):
+    """
+    Convert an extracted date string to ISO form (YYYY-MM-DD).
+    Numeric dates are read in DATE_ORDER ("MDY" or "DMY"); two-digit years
+    follow the strptime %y pivot. Returns None if the string is not a valid date.
+    """
+    raw = raw.strip()
+    match = NUMERIC_DATE_PATTERN.match(raw)
+    if match:
+        first, second, year = match.groups()
+        month, day = (first, second) if DATE_ORDER == "MDY" else (second, first)
+        year = int(year)
+        if len(match.group(3)) == 2:
+            year += 2000 if year < 69 else 1900
+        elif len(match.group(3)) == 3:
+            return None
+        try:
+            return date(year, int(month), int(day)).isoformat()
+        except ValueError:
+            return None
+
+    for date_format in TEXTUAL_DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+def normalize_dates(raw_dates):
+    """Sorted, de-duplicated ISO dates for a list of extracted date strings"""
+    return sorted({iso for iso in map(normalize_date, raw_dates) if iso})
+
+class DateIndex:
+    """
+    Sorted (ISO date, doc_id) entries, answering date range queries with bisect
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._doc_dates = {}
+        self._lock = threading.Lock()
+
+    def add(self, doc_id, iso_dates):
+        """Index a document's dates, replacing any it had before"""
+        with self._lock:
+            self._remove(doc_id)
+            dates = sorted(set(iso_dates))
+            for iso in dates:
+                insort(self.entries, (iso, doc_id))
+            if dates:
+                self._doc_dates[doc_id] = dates
+
+    def _remove(self, doc_id):
+        for iso in self._doc_dates.pop(doc_id, []):
+            position = bisect_left(self.entries, (iso, doc_id))
+            if position < len(self.entries) and self.entries[position] == (iso, doc_id):
+                del self.entries[position]
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def query(self, date_from=None, date_to=None):
+        """IDs of documents with any date in the inclusive ISO range, in date order"""
+        with self._lock:
+            start = bisect_left(self.entries, (date_from,)) if date_from else 0
+            # "~" sorts after every digit, so this lands past the last entry on date_to
+            end = bisect_right(self.entries, (date_to + "~",)) if date_to else len(self.entries)
+            doc_ids = [doc_id for _, doc_id in self.entries[start:end]]
+
+        return list(dict.fromkeys(doc_ids))
+
+date_index = DateIndex()
@@ -2,53 +2,161 @@ import sys
 import os
 import json
 import uuid
+import threading
+import time
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DOCUMENT_STORE_DIRECTORY, UPLOAD_FOLDER
 from models.document import Document
+from services.admission import ProcessingBudget, stage_slot
 from services.classification import classify_document
+from services.date_index import date_index
+from services.entity_index import entity_index
 from services.extraction import extract_metadata, generate_summary
+from services.pipeline import PIPELINE_STAGES, pipeline_versions_for, get_stale_stages
 from services.vector_store import VectorStore
 from utils.file_utils import extract_text
 
 # Initialize vector store
 vector_store = VectorStore()
 
-# In-memory document storage (replace with a database in production)
+# In-memory document storage, persisted to DOCUMENT_STORE_DIRECTORY (replace with a database in production)
 documents = {}
 next_id = 1
+_id_lock = threading.Lock()
+
+# Per-document locks serializing writes, so a deletion cannot interleave with reprocessing
+_document_locks = {}
+
+# Bumped on every change to the corpus so clients can invalidate cached responses.
+# Seeded from the clock so versions keep increasing across restarts.
+corpus_version = int(time.time() * 1000)
+
+def _document_path(doc_id):
+    return os.path.join(DOCUMENT_STORE_DIRECTORY, f"{doc_id}.json")
+
+def save_document(document):
+    """Persist a document record to the document store"""
+    os.makedirs(DOCUMENT_STORE_DIRECTORY, exist_ok=True)
+    path = _document_path(document.id)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(document.to_record(), f)
+    os.replace(tmp_path, path)
+    
+    # Pre-serialize the API representations while the record is hot
+    document.to_json()
+    document.to_json(include_text=False)
+
+def _index_document(document):
+    """Add a document to the secondary indexes"""
+    date_index.add(document.id, document.metadata.get("normalized_dates", []))
+    entity_index.add(document.id, document.metadata.get("entities", []))
+
+def _unindex_document(doc_id):
+    """Remove a document from the secondary indexes"""
+    date_index.remove(doc_id)
+    entity_index.remove(doc_id)
+
+def _load_documents():
+    """Load persisted document records into memory"""
+    global next_id
+    
+    # The entity index is persisted separately; indexing each loaded document
+    # below only journals the ones whose entities changed
+    entity_index.load()
+    
+    if not os.path.isdir(DOCUMENT_STORE_DIRECTORY):
+        entity_index.retain([])
+        return
+    
+    for name in os.listdir(DOCUMENT_STORE_DIRECTORY):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(DOCUMENT_STORE_DIRECTORY, name), 'r', encoding='utf-8') as f:
+                document = Document.from_record(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading document record {name}: {e}")
+            continue
+        documents[document.id] = document
+        _index_document(document)
+    
+    entity_index.retain(documents)
+    
+    if documents:
+        next_id = max(documents) + 1
+
+_load_documents()
+
+def _bump_corpus_version():
+    global corpus_version
+    
+    with _id_lock:
+        corpus_version += 1
+
+def get_corpus_version():
+    """Get the current corpus version"""
+    return corpus_version
+
+def _document_lock(doc_id):
+    with _id_lock:
+        return _document_locks.setdefault(doc_id, threading.Lock())
+
+def allocate_id():
+    """Reserve the next document ID"""
+    global next_id
+    
+    with _id_lock:
+        doc_id = next_id
+        next_id += 1
+    return doc_id
+
+def register_document(document):
+    """Store a fully built document, e.g. one restored from a snapshot"""
+    global next_id
+    
+    with _id_lock:
+        next_id = max(next_id, document.id + 1)
+    documents[document.id] = document
+    save_document(document)
+    _index_document(document)
+    _bump_corpus_version()
 
 def process_document(file_path, filename):
     """
     Process a document file and extract all relevant information
     """
-    global next_id
+    # Stages degrade instead of running unbounded on huge inputs
+    budget = ProcessingBudget()
     
     # Extract text from the document
-    text = extract_text(file_path)
+    budget.start("extraction")
+    text = extract_text(file_path, budget=budget)
     
     # Classify the document
     doc_type = classify_document(text)
     
     # Extract metadata
-    metadata = extract_metadata(text, doc_type)
+    metadata = extract_metadata(text, doc_type, budget=budget)
     
     # Generate summary
-    summary = generate_summary(text)
+    summary = generate_summary(text, budget=budget)
     
     # Create document record
-    doc_id = next_id
-    next_id += 1
+    doc_id = allocate_id()
     
     # Store document vector embeddings
-    vector_id = vector_store.add_document(
-        doc_id=doc_id,
-        text=text,
-        metadata={
-            "filename": filename,
-            "type": doc_type,
-            "summary": summary
-        }
-    )
+    with stage_slot("embedding"):
+        vector_id = vector_store.add_document(
+            doc_id=doc_id,
+            text=text,
+            metadata={
+                "filename": filename,
+                "type": doc_type,
+                "summary": summary
+            }
+        )
     
     # Create document object
     document = Document(
@@ -59,14 +167,106 @@ def process_document(file_path, filename):
         metadata=metadata,
         summary=summary,
         text=text,
-        vector_id=vector_id
+        vector_id=vector_id,
+        pipeline_versions=pipeline_versions_for(file_path),
+        degradations=budget.degradations
     )
     
-    # Store document in memory
+    # Store document
     documents[doc_id] = document
+    save_document(document)
+    _index_document(document)
+    _bump_corpus_version()
     
     return document
 
+def reprocess_document(doc_id, stages=None):
+    """
+    Re-run pipeline stages for a stored document.
+    Only stale stages run unless stages is given. Stored extracted text is
+    reused unless the extraction stage itself is stale, and re-extraction only
+    cascades to the later stages when it actually changed the text.
+    Returns the list of stages that were re-run, or None if the document does
+    not exist or was deleted while its stages were running.
+    """
+    document = documents.get(doc_id)
+    if not document:
+        return None
+    
+    stages = set(stages if stages is not None else get_stale_stages(document))
+    if not stages:
+        return []
+    
+    text = document.text
+    doc_type = document.type
+    summary = document.summary
+    versions = dict(document.pipeline_versions)
+    current = pipeline_versions_for(document.filepath)
+    # Same limits as an upload, so reprocessing a huge file degrades instead of running unbounded
+    budget = ProcessingBudget()
+    
+    if "extraction" in stages:
+        if os.path.exists(document.filepath):
+            budget.start("extraction")
+            text = extract_text(document.filepath, budget=budget)
+            versions["extraction"] = current["extraction"]
+            if text != document.text:
+                # Everything downstream depends on the text
+                stages.update(PIPELINE_STAGES)
+        else:
+            # Source file is gone; keep the stored text and leave the stage stale
+            stages.discard("extraction")
+    
+    if "classification" in stages:
+        doc_type = classify_document(text)
+        versions["classification"] = current["classification"]
+        if doc_type != document.type:
+            # Domain-specific metadata depends on the type
+            stages.add("metadata")
+    
+    metadata = document.metadata
+    if "metadata" in stages:
+        metadata = extract_metadata(text, doc_type, budget=budget)
+        versions["metadata"] = current["metadata"]
+    
+    if "summary" in stages:
+        summary = generate_summary(text, budget=budget)
+        versions["summary"] = current["summary"]
+    
+    vector_metadata = {
+        "filename": document.filename,
+        "type": doc_type,
+        "summary": summary
+    }
+    with _document_lock(doc_id):
+        # Deleted while the stages above ran: writing now would resurrect it
+        if documents.get(doc_id) is not document:
+            return None
+        
+        if "embedding" in stages:
+            with stage_slot("embedding"):
+                if document.vector_id:
+                    document.vector_id = vector_store.update_document(document.vector_id, doc_id, text, vector_metadata)
+                else:
+                    document.vector_id = vector_store.add_document(doc_id=doc_id, text=text, metadata=vector_metadata)
+            versions["embedding"] = current["embedding"]
+        elif document.vector_id and (doc_type != document.type or summary != document.summary):
+            # The vector itself is current but its stored metadata is not
+            document.vector_id = vector_store.update_metadata(document.vector_id, doc_id, vector_metadata)
+        
+        document.text = text
+        document.type = doc_type
+        document.metadata = metadata
+        document.summary = summary
+        document.pipeline_versions = versions
+        # Degradations from the stages that just re-ran no longer apply
+        document.degradations = [d for d in document.degradations if d["stage"] not in stages] + budget.degradations
+        save_document(document)
+        _index_document(document)
+        _bump_corpus_version()
+    
+    return [stage for stage in PIPELINE_STAGES if stage in stages]
+
 def get_document(doc_id):
     """Get a document by ID"""
     return documents.get(doc_id)
@@ -75,58 +275,98 @@ def get_all_documents():
     """Get all documents"""
     return list(documents.values())
 
-def search_documents(query, limit=10):
+def search_entities(entity_type=None, prefix=None, limit=50, offset=0):
+    """Search indexed entities by type and text prefix, most frequent first"""
+    return entity_index.search(entity_type=entity_type, prefix=prefix, limit=limit, offset=offset)
+
+def get_documents_for_entity(entity_type, text, limit=50, offset=0):
     """
-    Search for documents matching the query
+    Get a page of documents mentioning an entity
+    Returns (documents, total), or None if the entity is unknown
+    """
+    result = entity_index.documents_for(entity_type, text, limit=limit, offset=offset)
+    if result is None:
+        return None
+    doc_ids, total = result
+    return [documents[doc_id] for doc_id in doc_ids if doc_id in documents], total
+
+def get_documents_in_date_range(date_from=None, date_to=None):
+    """Get documents mentioning any date in the inclusive ISO range, via the date index"""
+    return [documents[doc_id] for doc_id in date_index.query(date_from, date_to) if doc_id in documents]
+
+def search_document_hits(query, limit=10, doc_type=None):
+    """
+    Search for documents matching the query, optionally of a single type
+    Returns a list of (document, similarity) pairs
     """
     # Use vector store for semantic search
-    vector_results = vector_store.search_similar(query, limit=limit)
+    vector_results = vector_store.search_similar(query, limit=limit, doc_type=doc_type)
     
-    results = []
-    for result in vector_results:
-        doc_id = result["doc_id"]
-        if doc_id in documents:
-            results.append({
-                "document": documents[doc_id].to_dict(),
-                "similarity": result["score"]
-            })
-    
-    return results
+    return [(documents[result["doc_id"]], result["score"])
+            for result in vector_results if result["doc_id"] in documents]
 
-def find_related_documents(doc_id, limit=5):
-    """Find documents related to the given document"""
+def search_documents(query, limit=10, doc_type=None):
+    """
+    Search for documents matching the query
+    """
+    return [{"document": doc.to_dict(), "similarity": similarity}
+            for doc, similarity in search_document_hits(query, limit=limit, doc_type=doc_type)]
+
+def find_related_hits(doc_id, limit=5):
+    """
+    Find documents related to the given document
+    Returns a list of (document, similarity) pairs, or None if the document does not exist
+    """
     doc = get_document(doc_id)
     if not doc:
-        return []
+        return None
     
     related = vector_store.find_related(doc_id, doc.text, limit=limit)
     
-    results = []
-    for result in related:
-        related_doc_id = result["doc_id"]
-        if related_doc_id in documents:
-            results.append({
-                "document": documents[related_doc_id].to_dict(),
-                "similarity": result["score"]
-            })
-    
-    return results
+    return [(documents[result["doc_id"]], result["score"])
+            for result in related if result["doc_id"] in documents]
+
+def find_related_documents(doc_id, limit=5):
+    """Find documents related to the given document"""
+    return [{"document": doc.to_dict(), "similarity": similarity}
+            for doc, similarity in find_related_hits(doc_id, limit=limit) or []]
 
 def delete_document(doc_id):
     """Delete a document"""
+    with _document_lock(doc_id):
+        deleted = _delete_document(doc_id)
+    with _id_lock:
+        _document_locks.pop(doc_id, None)
+    return deleted
+
+def _owns_file(document):
+    """Whether the document's file is an uploaded copy the app may delete"""
+    upload_folder = os.path.realpath(UPLOAD_FOLDER)
+    filepath = os.path.realpath(document.filepath)
+    return document.source == "upload" and os.path.commonpath([upload_folder, filepath]) == upload_folder
+
+def _delete_document(doc_id):
     if doc_id in documents:
         # Delete from vector store
         vector_store.delete_document(documents[doc_id].vector_id)
         
-        # Delete file if exists
+        # Delete the uploaded copy; bulk-ingested files belong to the user's own tree
         try:
-            if os.path.exists(documents[doc_id].filepath):
+            if _owns_file(documents[doc_id]) and os.path.exists(documents[doc_id].filepath):
                 os.remove(documents[doc_id].filepath)
         except:
             pass
         
+        # Delete persisted record
+        try:
+            os.remove(_document_path(doc_id))
+        except OSError:
+            pass
+        
         # Remove from memory
         del documents[doc_id]
+        _unindex_document(doc_id)
+        _bump_corpus_version()
         return True
     
-    return False
\ No newline at end of file
+    return False
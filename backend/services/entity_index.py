@@ -0,0 +1,221 @@
+import sys
+import os
+import json
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import ENTITY_INDEX_DIRECTORY, ENTITY_INDEX_COMPACT_EVERY
+
+SNAPSHOT_FILE = "snapshot.json"
+JOURNAL_FILE = "journal.jsonl"
+
+def normalize_entity(text):
+    """Case- and whitespace-insensitive form used as the index key"""
+    return " ".join(text.split()).strip(".,;:'\"()").casefold()
+
+def _type_key(entity_type):
+    """Entity types are matched the same way as entity text, so ?type=org finds ORG"""
+    return normalize_entity(entity_type or "")
+
+class EntityIndex:
+    """
+    Inverted index of (normalized type, normalized text) -> {doc_id: mentions}.
+    Changes are appended to a journal and folded into a snapshot every
+    ENTITY_INDEX_COMPACT_EVERY entries, so the index survives restarts
+    without being rewritten on every upload.
+    """
+
+    def __init__(self, directory=ENTITY_INDEX_DIRECTORY, compact_every=ENTITY_INDEX_COMPACT_EVERY):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.postings = {}
+        self.display = {}
+        self.type_display = {}
+        self._sorted_keys = {}
+        # Keys ordered by document count, per type and across all types (None);
+        # rebuilt lazily after a change to that type
+        self._ranked = {}
+        self._doc_entities = {}
+        self._journal_entries = 0
+        self._lock = threading.Lock()
+
+    # Index maintenance
+
+    def _apply_add(self, doc_id, entries):
+        self._apply_remove(doc_id)
+        if not entries:
+            return
+        self._doc_entities[doc_id] = entries
+        for entity_type, norm, text, mentions in entries:
+            type_key = _type_key(entity_type)
+            key = (type_key, norm)
+            if key not in self.postings:
+                self.postings[key] = {}
+                self.display[key] = text
+                self.type_display.setdefault(type_key, entity_type)
+                insort(self._sorted_keys.setdefault(type_key, []), norm)
+            self.postings[key][doc_id] = mentions
+            self._invalidate_ranking(type_key)
+
+    def _apply_remove(self, doc_id):
+        for entity_type, norm, _, _ in self._doc_entities.pop(doc_id, []):
+            type_key = _type_key(entity_type)
+            key = (type_key, norm)
+            docs = self.postings.get(key)
+            if docs is None:
+                continue
+            docs.pop(doc_id, None)
+            self._invalidate_ranking(type_key)
+            if not docs:
+                del self.postings[key]
+                del self.display[key]
+                keys = self._sorted_keys[type_key]
+                del keys[bisect_left(keys, norm)]
+
+    def _invalidate_ranking(self, type_key):
+        self._ranked.pop(type_key, None)
+        self._ranked.pop(None, None)
+
+    def _ranking(self, type_key):
+        """Keys of one type, or of all types for None, by descending document count"""
+        ranked = self._ranked.get(type_key)
+        if ranked is None:
+            types = [type_key] if type_key is not None else list(self._sorted_keys)
+            ranked = [(t, norm) for t in types for norm in self._sorted_keys.get(t, [])]
+            ranked.sort(key=self._rank)
+            self._ranked[type_key] = ranked
+        return ranked
+
+    def _rank(self, key):
+        return (-len(self.postings[key]), key[1])
+
+    def _entries_for(self, entities):
+        mentions = Counter()
+        display = {}
+        for entity in entities:
+            norm = normalize_entity(entity.get("text", ""))
+            if not norm:
+                continue
+            key = (entity.get("type"), norm)
+            mentions[key] += 1
+            display.setdefault(key, " ".join(entity["text"].split()))
+        return [[entity_type, norm, display[(entity_type, norm)], count]
+                for (entity_type, norm), count in mentions.items()]
+
+    def add(self, doc_id, entities):
+        """Index a document's entities, replacing whatever it had before"""
+        entries = self._entries_for(entities)
+        with self._lock:
+            if self._doc_entities.get(doc_id, []) == entries:
+                return
+            self._apply_add(doc_id, entries)
+            self._journal({"op": "add", "doc_id": doc_id, "entities": entries})
+
+    def remove(self, doc_id):
+        with self._lock:
+            if doc_id not in self._doc_entities:
+                return
+            self._apply_remove(doc_id)
+            self._journal({"op": "remove", "doc_id": doc_id})
+
+    def retain(self, doc_ids):
+        """Drop indexed documents that are no longer in the document store"""
+        doc_ids = set(doc_ids)
+        for doc_id in list(self._doc_entities):
+            if doc_id not in doc_ids:
+                self.remove(doc_id)
+
+    # Persistence
+
+    def _journal(self, entry):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, JOURNAL_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+        self._journal_entries += 1
+        if self._journal_entries >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        """Write the whole index as a snapshot and truncate the journal"""
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({str(doc_id): entries for doc_id, entries in self._doc_entities.items()}, f)
+        os.replace(path + ".tmp", path)
+        open(os.path.join(self.directory, JOURNAL_FILE), 'w').close()
+        self._journal_entries = 0
+
+    def load(self):
+        """Load the snapshot and replay the journal written since"""
+        with self._lock:
+            snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+            if os.path.exists(snapshot_path):
+                with open(snapshot_path, 'r', encoding='utf-8') as f:
+                    for doc_id, entries in json.load(f).items():
+                        self._apply_add(int(doc_id), entries)
+
+            journal_path = os.path.join(self.directory, JOURNAL_FILE)
+            if os.path.exists(journal_path):
+                with open(journal_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # A torn final line from a crash; everything before it is intact
+                            break
+                        if entry["op"] == "add":
+                            self._apply_add(entry["doc_id"], entry["entities"])
+                        else:
+                            self._apply_remove(entry["doc_id"])
+                        self._journal_entries += 1
+
+    # Queries
+
+    def _entity_info(self, key):
+        docs = self.postings[key]
+        return {
+            "text": self.display[key],
+            "type": self.type_display[key[0]],
+            "document_count": len(docs),
+            "mention_count": sum(docs.values())
+        }
+
+    def search(self, entity_type=None, prefix=None, limit=50, offset=0):
+        """
+        Entities matching an optional type and text prefix, most frequent first.
+        Returns (entities, total).
+        """
+        type_key = _type_key(entity_type) if entity_type else None
+        with self._lock:
+            if not prefix:
+                keys = self._ranking(type_key)
+            else:
+                # Only the keys in the prefix range are ranked
+                norm_prefix = normalize_entity(prefix)
+                keys = []
+                for t in [type_key] if type_key is not None else list(self._sorted_keys):
+                    sorted_keys = self._sorted_keys.get(t, [])
+                    start = bisect_left(sorted_keys, norm_prefix)
+                    end = bisect_left(sorted_keys, norm_prefix + "\uffff")
+                    keys.extend((t, norm) for norm in sorted_keys[start:end])
+                keys.sort(key=self._rank)
+            return [self._entity_info(key) for key in keys[offset:offset + limit]], len(keys)
+
+    def documents_for(self, entity_type, text, limit=50, offset=0):
+        """
+        IDs of documents mentioning an entity, most mentions first.
+        Returns (doc_ids, total), or None if the entity is not indexed.
+        """
+        with self._lock:
+            docs = self.postings.get((_type_key(entity_type), normalize_entity(text)))
+            if docs is None:
+                return None
+            doc_ids = sorted(docs, key=lambda doc_id: (-docs[doc_id], doc_id))
+            return doc_ids[offset:offset + limit], len(doc_ids)
+
+    def top_entities(self, entity_type=None, limit=20):
+        entities, _ = self.search(entity_type=entity_type, limit=limit)
+        return entities
+
+entity_index = EntityIndex()
@@ -2,37 +2,74 @@ import spacy
 import nltk
 from nltk.tokenize import word_tokenize
 import re
+import math
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import NLP_MODEL
+from config import (NLP_MODEL, WINDOWED_EXTRACTION, EXTRACTION_WINDOW_CHARS, EXTRACTION_WINDOW_OVERLAP,
+                    NER_PROCESSES, NER_PARALLEL_MIN_WINDOWS, NER_BATCH_SIZE)
+from services.admission import stage_slot
+from services.date_index import normalize_date, normalize_dates
+from utils.text_windows import iter_windows
 
 # Initialize NLP components
 nlp = spacy.load(NLP_MODEL)
 nltk.download('punkt', quiet=True)
 nltk.download('punkt_tab')
 
-def extract_metadata(text, doc_type):
+# Text is run through NER in chunks so a time budget can stop between them
+NER_MAX_CHARS = 10000
+NER_CHUNK_CHARS = 2000
+NER_CHUNK_OVERLAP = 200
+SUMMARY_MAX_CHARS = 5000
+SUMMARY_DEGRADED_CHARS = 1000
+
+ENTITY_TYPES = ["PERSON", "ORG", "GPE", "MONEY", "DATE", "CARDINAL"]
+DATE_PATTERN = r'\b\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4}\b'
+
+def extract_metadata(text, doc_type, budget=None, windowed=None, n_process=1):
     """
-    Extract key metadata from document text based on document type
+    Extract key metadata from document text based on document type.
+    Texts longer than one window are walked in full with overlapping windows
+    unless windowed is set explicitly. n_process sets the NER worker processes
+    for windowed texts; None picks them from the text length. Workers are
+    forked, so only single-threaded callers such as CLI tools may ask for
+    more than one; the threaded API server keeps the default.
     """
+    if budget:
+        budget.start("metadata")
+    
+    if windowed is None:
+        windowed = WINDOWED_EXTRACTION and len(text) > EXTRACTION_WINDOW_CHARS
+    if windowed:
+        return _extract_metadata_windowed(text, doc_type, budget, n_process)
+    
     metadata = {
         "entities": [],
         "dates": [],
+        "normalized_dates": [],
         "key_terms": [],
         "domain_specific": {}
     }
     
     # Extract entities using spaCy
-    doc = nlp(text[:10000])  # Limit text for processing speed
-    for ent in doc.ents:
-        if ent.label_ in ["PERSON", "ORG", "GPE", "MONEY", "DATE", "CARDINAL"]:
-            metadata["entities"].append({"text": ent.text, "type": ent.label_})
+    ner_text = text[:NER_MAX_CHARS]  # Limit text for processing speed
+    # Overlapping chunks split on whitespace give spaCy context at every boundary;
+    # each entity is kept only by the chunk that owns its start
+    chunks = ((chunk, (start, own_start, own_end))
+              for start, own_start, own_end, chunk in iter_windows(ner_text, NER_CHUNK_CHARS, NER_CHUNK_OVERLAP))
+    with stage_slot("nlp"):
+        for doc, (start, own_start, own_end) in nlp.pipe(chunks, as_tuples=True, batch_size=1):
+            for ent in doc.ents:
+                if ent.label_ in ENTITY_TYPES and own_start <= start + ent.start_char < own_end:
+                    metadata["entities"].append({"text": ent.text, "type": ent.label_})
+            if budget and budget.exhausted("metadata") and own_end < len(ner_text):
+                budget.record("metadata", "ner_truncated", chars_processed=own_end)
+                break
     
     # Extract dates with regex
-    date_pattern = r'\b\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4}\b'
-    metadata["dates"] = re.findall(date_pattern, text)
+    metadata["dates"] = re.findall(DATE_PATTERN, text)
     
     # Extract key terms based on frequency
     tokens = word_tokenize(text.lower())
@@ -41,20 +78,101 @@ def extract_metadata(text, doc_type):
     metadata["key_terms"] = [term for term, freq in freq_dist.most_common(10)]
     
     # Domain-specific extraction
-    if doc_type == "Invoice":
-        metadata["domain_specific"] = extract_invoice_data(text)
-    elif doc_type == "Contract":
-        metadata["domain_specific"] = extract_contract_data(text)
-    elif doc_type == "Medical":
-        metadata["domain_specific"] = extract_medical_data(text)
-    elif doc_type == "Legal":
-        metadata["domain_specific"] = extract_legal_data(text)
+    extractor = DOMAIN_EXTRACTORS.get(doc_type)
+    if extractor:
+        metadata["domain_specific"] = extractor(text)
     
+    _add_normalized_dates(metadata)
     return metadata
 
-def generate_summary(text):
+def _add_normalized_dates(metadata):
+    """Add ISO forms of the extracted dates, used by the date index"""
+    raw_dates = list(metadata["dates"])
+    effective_date = metadata["domain_specific"].get("effective_date")
+    if effective_date:
+        iso = normalize_date(effective_date)
+        if iso:
+            metadata["domain_specific"]["effective_date_iso"] = iso
+            raw_dates.append(effective_date)
+    metadata["normalized_dates"] = normalize_dates(raw_dates)
+
+def _ner_processes(text, n_process=None):
+    """
+    Worker processes for windowed NER. None sizes them automatically:
+    starting workers only pays off for texts with many windows.
+    """
+    if n_process is not None:
+        return n_process
+    window_count = math.ceil(len(text) / max(EXTRACTION_WINDOW_CHARS - EXTRACTION_WINDOW_OVERLAP, 1))
+    return NER_PROCESSES if window_count >= NER_PARALLEL_MIN_WINDOWS else 1
+
+def _extract_entities_windowed(text, budget=None, n_process=None):
+    """Run NER over every window, in worker processes for long texts, and merge entities by absolute position"""
+    spans = {}
+    windows = ((window, (start, own_start, own_end)) for start, own_start, own_end, window in iter_windows(text))
+    
+    with stage_slot("nlp"):
+        docs = nlp.pipe(windows, as_tuples=True, n_process=_ner_processes(text, n_process), batch_size=NER_BATCH_SIZE)
+        for doc, (start, own_start, own_end) in docs:
+            for ent in doc.ents:
+                ent_start = start + ent.start_char
+                # Entities in the overlap are seen by two windows; only the owner keeps them
+                if ent.label_ in ENTITY_TYPES and own_start <= ent_start < own_end:
+                    spans[(ent_start, start + ent.end_char, ent.label_)] = ent.text
+            if budget and budget.exhausted("metadata") and own_end < len(text):
+                budget.record("metadata", "ner_truncated", chars_processed=own_end)
+                docs.close()
+                break
+    
+    return [{"text": spans[key], "type": key[2]} for key in sorted(spans)]
+
+def _extract_metadata_windowed(text, doc_type, budget=None, n_process=None):
+    """
+    Windowed variant of extract_metadata covering the full text.
+    Each pass only holds one window's worth of spaCy or tokenizer state.
+    """
+    metadata = {
+        "entities": _extract_entities_windowed(text, budget, n_process),
+        "dates": [],
+        "normalized_dates": [],
+        "key_terms": [],
+        "domain_specific": {}
+    }
+    
+    freq_dist = nltk.FreqDist()
+    extractor = DOMAIN_EXTRACTORS.get(doc_type)
+    for start, own_start, own_end, window in iter_windows(text):
+        # Dates found in the overlap belong to the window owning their start
+        for match in re.finditer(DATE_PATTERN, window):
+            if own_start <= start + match.start() < own_end:
+                metadata["dates"].append(match.group())
+        
+        # Owned ranges end on whitespace, so counting them never splits a token
+        tokens = word_tokenize(text[own_start:own_end].lower())
+        freq_dist.update(t for t in tokens if len(t) > 3 and not t.isdigit())
+        
+        # The first window with a match wins, like re.search over the whole text
+        if extractor:
+            for key, value in extractor(window).items():
+                metadata["domain_specific"].setdefault(key, value)
+    
+    metadata["key_terms"] = [term for term, freq in freq_dist.most_common(10)]
+    
+    _add_normalized_dates(metadata)
+    return metadata
+
+def generate_summary(text, budget=None):
     """Generate a short summary of the document"""
-    doc = nlp(text[:5000])  # Limit text for processing speed
+    max_chars = SUMMARY_MAX_CHARS  # Limit text for processing speed
+    if budget:
+        budget.start("summary")
+        if budget.exhausted("summary"):
+            # Earlier stages used up the document budget; summarize a shorter prefix
+            max_chars = SUMMARY_DEGRADED_CHARS
+            budget.record("summary", "summary_shortened", chars_used=max_chars)
+    
+    with stage_slot("nlp"):
+        doc = nlp(text[:max_chars])
     sentences = [sent.text.strip() for sent in doc.sents]
     if not sentences:
         return "No text content available for summarization."
@@ -133,4 +251,12 @@ def extract_legal_data(text):
     if court_match:
         result["court"] = court_match.group(1).strip()
     
-    return result
\ No newline at end of file
+    return result
+
+# Domain-specific extractors by document type
+DOMAIN_EXTRACTORS = {
+    "Invoice": extract_invoice_data,
+    "Contract": extract_contract_data,
+    "Medical": extract_medical_data,
+    "Legal": extract_legal_data
+}
@@ -0,0 +1,22 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import PIPELINE_VERSIONS, EXTRACTION_FORMAT_VERSIONS
+
+# Pipeline stages in execution order
+PIPELINE_STAGES = ["extraction", "classification", "metadata", "summary", "embedding"]
+
+def pipeline_versions_for(file_path):
+    """Current stage versions for a file, with the extraction version specific to its format"""
+    versions = dict(PIPELINE_VERSIONS)
+    extension = os.path.splitext(file_path)[1].lower().lstrip('.')
+    if extension in EXTRACTION_FORMAT_VERSIONS:
+        versions["extraction"] += f":{extension}{EXTRACTION_FORMAT_VERSIONS[extension]}"
+    return versions
+
+def get_stale_stages(document):
+    """List the pipeline stages whose recorded version differs from the current one"""
+    current = pipeline_versions_for(document.filepath)
+    return [stage for stage in PIPELINE_STAGES
+            if document.pipeline_versions.get(stage) != current[stage]]
@@ -0,0 +1,132 @@
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import REPROCESS_WORKERS
+from services.document_service import get_all_documents, get_stale_stages, reprocess_document
+
+class ReprocessJob:
+    """
+    Re-runs stale pipeline stages across the corpus in parallel.
+    Version stamps are persisted per document as soon as it finishes, so an
+    interrupted or cancelled job resumes by simply starting a new one: only
+    documents that are still stale get picked up.
+    """
+    
+    def __init__(self, stages=None, workers=REPROCESS_WORKERS, progress_callback=None):
+        self.stages = stages
+        self.workers = max(1, workers)
+        self.progress_callback = progress_callback
+        self.status = "pending"
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.errors = {}
+        self.started_at = None
+        self.finished_at = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def _pending_doc_ids(self):
+        if self.stages is not None:
+            return [doc.id for doc in get_all_documents()]
+        return [doc.id for doc in get_all_documents() if get_stale_stages(doc)]
+    
+    def _process(self, doc_id):
+        if self._cancelled.is_set():
+            return None
+        return reprocess_document(doc_id, stages=self.stages)
+    
+    def run(self):
+        """Run the job in the calling thread"""
+        self.status = "running"
+        self.started_at = time.time()
+        doc_ids = self._pending_doc_ids()
+        self.total = len(doc_ids)
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._process, doc_id): doc_id for doc_id in doc_ids}
+            try:
+                for future in as_completed(futures):
+                    doc_id = futures[future]
+                    with self._lock:
+                        try:
+                            if future.result() is not None:
+                                self.completed += 1
+                        except Exception as e:
+                            self.failed += 1
+                            self.errors[doc_id] = str(e)
+                    if self.progress_callback:
+                        self.progress_callback(self)
+            except BaseException:
+                # Stop queued documents from starting before the pool shuts down
+                self.cancel()
+                self.status = "cancelled"
+                raise
+        
+        self.status = "cancelled" if self._cancelled.is_set() else "finished"
+        self.finished_at = time.time()
+        return self
+    
+    def start(self):
+        """Run the job in a background thread"""
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self
+    
+    def cancel(self):
+        self._cancelled.set()
+    
+    def is_running(self):
+        return self.status in ("pending", "running") and self._thread is not None and self._thread.is_alive()
+    
+    def to_dict(self):
+        elapsed = None
+        if self.started_at:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "status": self.status,
+            "stages": self.stages,
+            "workers": self.workers,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "errors": {str(k): v for k, v in self.errors.items()},
+            "elapsed_seconds": elapsed
+        }
+
+# Most recent background job
+_current_job = None
+_job_lock = threading.Lock()
+
+def start_reprocess_job(stages=None, workers=REPROCESS_WORKERS):
+    """
+    Start a background reprocess job.
+    Returns (job, started); started is False if a job is already running.
+    """
+    global _current_job
+    
+    with _job_lock:
+        if _current_job is not None and _current_job.is_running():
+            return _current_job, False
+        _current_job = ReprocessJob(stages=stages, workers=workers).start()
+        return _current_job, True
+
+def get_reprocess_job():
+    return _current_job
+
+def get_pipeline_status():
+    """Count documents that are stale per pipeline stage"""
+    stale = {}
+    documents = get_all_documents()
+    for doc in documents:
+        for stage in get_stale_stages(doc):
+            stale[stage] = stale.get(stage, 0) + 1
+    return {
+        "total_documents": len(documents),
+        "stale_stages": stale
+    }
@@ -0,0 +1,244 @@
+import sys
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SIMILARITY_GRAPH_K, SIMILARITY_BLOCK_SIZE, CLUSTER_SIMILARITY_THRESHOLD
+from services.document_service import vector_store, get_document, get_corpus_version
+
+def _normalize(matrix):
+    """Scale rows to unit length so dot products are cosine similarities"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def _merge_top_k(idx_a, scores_a, idx_b, scores_b, k):
+    """Merge two candidate lists per row, keeping the k best sorted by descending score"""
+    idx = np.concatenate([idx_a, idx_b], axis=1)
+    scores = np.concatenate([scores_a, scores_b], axis=1)
+    if scores.shape[1] > k:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        idx = np.take_along_axis(idx, part, axis=1)
+        scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+def top_k_similar(queries, corpus, k, block_size=SIMILARITY_BLOCK_SIZE, query_rows=None, column_offset=0):
+    """
+    Blocked top-k cosine similarity of every query row against the corpus rows.
+    Both inputs must be row-normalized. query_rows gives each query's own row
+    index in the corpus so it is excluded from its neighbors. Returned indices
+    are corpus rows shifted by column_offset; empty slots hold -1 / -inf.
+    """
+    n = queries.shape[0]
+    idx = np.full((n, k), -1, dtype=np.int64)
+    scores = np.full((n, k), -np.inf, dtype=np.float32)
+
+    for q_start in range(0, n, block_size):
+        q_block = queries[q_start:q_start + block_size]
+        block_idx = idx[q_start:q_start + block_size]
+        block_scores = scores[q_start:q_start + block_size]
+
+        for c_start in range(0, corpus.shape[0], block_size):
+            c_block = corpus[c_start:c_start + block_size]
+            sims = q_block @ c_block.T
+
+            if query_rows is not None:
+                own = query_rows[q_start:q_start + block_size] - c_start
+                mask = (own >= 0) & (own < c_block.shape[0])
+                sims[np.nonzero(mask)[0], own[mask]] = -np.inf
+
+            cols = np.broadcast_to(np.arange(c_start, c_start + c_block.shape[0]) + column_offset, sims.shape)
+            block_idx, block_scores = _merge_top_k(block_idx, block_scores, cols, sims, k)
+
+        idx[q_start:q_start + block_size] = block_idx
+        scores[q_start:q_start + block_size] = block_scores
+
+    # Excluded self matches must not survive as neighbors
+    idx[np.isneginf(scores)] = -1
+    return idx, scores
+
+class SimilarityGraph:
+    """
+    Top-k similarity graph over every stored embedding, with clusters.
+    Refreshed incrementally: only added, removed or re-embedded vectors
+    trigger new similarity computations.
+    """
+
+    def __init__(self, k=SIMILARITY_GRAPH_K, block_size=SIMILARITY_BLOCK_SIZE,
+                 threshold=CLUSTER_SIMILARITY_THRESHOLD):
+        self.k = k
+        self.block_size = block_size
+        self.threshold = threshold
+        self.vector_ids = []
+        self.doc_ids = np.empty(0, dtype=np.int64)
+        self.matrix = None
+        self.neighbors = np.empty((0, k), dtype=np.int64)
+        self.scores = np.empty((0, k), dtype=np.float32)
+        self.labels = np.empty(0, dtype=np.int64)
+        self.version = None
+        self._lock = threading.Lock()
+
+    def _wanted_vectors(self):
+        """Vectors that belong to documents currently in the corpus"""
+        vector_ids, doc_ids = vector_store.get_vector_ids()
+        wanted = [(v, d) for v, d in zip(vector_ids, doc_ids) if get_document(d)]
+        return [v for v, d in wanted], [d for v, d in wanted]
+
+    def _rebuild(self, vector_ids, doc_ids):
+        self.vector_ids = list(vector_ids)
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        self.matrix = _normalize(vector_store.get_embeddings(self.vector_ids))
+        n = len(self.vector_ids)
+        self.neighbors, self.scores = top_k_similar(self.matrix, self.matrix, self.k, self.block_size,
+                                                    query_rows=np.arange(n))
+
+    def _update(self, vector_ids, doc_ids, updated):
+        wanted = set(vector_ids)
+        keep = np.array([v in wanted and v not in updated for v in self.vector_ids], dtype=bool)
+
+        # Drop removed and re-embedded rows and remap neighbor indices
+        remap = np.full(len(self.vector_ids) + 1, -1, dtype=np.int64)
+        remap[:-1][keep] = np.arange(int(keep.sum()))
+        neighbors = remap[self.neighbors[keep]]  # -1 stays -1 through the sentinel slot
+        scores = self.scores[keep]
+        affected = np.any((neighbors == -1) & (self.neighbors[keep] != -1), axis=1)
+        scores[neighbors == -1] = -np.inf
+
+        self.vector_ids = [v for v, kept in zip(self.vector_ids, keep) if kept]
+        self.matrix = self.matrix[keep]
+
+        # Append new and re-embedded vectors
+        present = set(self.vector_ids)
+        doc_by_vector = dict(zip(vector_ids, doc_ids))
+        added = [v for v in vector_ids if v not in present]
+        n_old = len(self.vector_ids)
+        if added:
+            new_rows = _normalize(vector_store.get_embeddings(added))
+            self.matrix = np.vstack([self.matrix, new_rows]) if n_old else new_rows
+            self.vector_ids.extend(added)
+        self.doc_ids = np.asarray([doc_by_vector[v] for v in self.vector_ids], dtype=np.int64)
+        n = len(self.vector_ids)
+
+        if added and n_old:
+            # Existing rows only need comparing against the new columns
+            new_idx, new_scores = top_k_similar(self.matrix[:n_old], self.matrix[n_old:], self.k,
+                                                self.block_size, column_offset=n_old)
+            neighbors, scores = _merge_top_k(neighbors, scores, new_idx, new_scores, self.k)
+
+        # Rows that lost a neighbor, plus the new rows, need a full pass
+        recompute = np.concatenate([np.nonzero(affected)[0], np.arange(n_old, n)]).astype(np.int64)
+        neighbors = np.vstack([neighbors, np.full((n - n_old, self.k), -1, dtype=np.int64)])
+        scores = np.vstack([scores, np.full((n - n_old, self.k), -np.inf, dtype=np.float32)])
+        if len(recompute):
+            idx, sc = top_k_similar(self.matrix[recompute], self.matrix, self.k, self.block_size,
+                                    query_rows=recompute)
+            neighbors[recompute] = idx
+            scores[recompute] = sc
+
+        neighbors[np.isneginf(scores)] = -1
+        self.neighbors, self.scores = neighbors, scores
+
+    def _cluster(self):
+        """Connected components over edges at or above the similarity threshold"""
+        n = len(self.vector_ids)
+        parent = list(range(n))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        rows, cols = np.nonzero((self.scores >= self.threshold) & (self.neighbors >= 0))
+        for i, j in zip(rows.tolist(), self.neighbors[rows, cols].tolist()):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        # Number clusters by size, largest first
+        roots = [find(i) for i in range(n)]
+        sizes = Counter(roots)
+        cluster_ids = {root: cid for cid, (root, _) in enumerate(sizes.most_common())}
+        self.labels = np.asarray([cluster_ids[root] for root in roots], dtype=np.int64)
+
+    def refresh(self, force=False):
+        """
+        Bring the graph up to date with the corpus.
+        Returns (version, doc_ids, neighbors, scores, labels) as one consistent
+        view; refreshes replace these arrays rather than modifying them, so the
+        view stays valid after the lock is released.
+        """
+        with self._lock:
+            version = get_corpus_version()
+            if force or version != self.version:
+                vector_ids, doc_ids = self._wanted_vectors()
+                updated = vector_store.pop_updated_ids()
+                if force or self.matrix is None or not self.vector_ids:
+                    self._rebuild(vector_ids, doc_ids)
+                else:
+                    self._update(vector_ids, doc_ids, updated)
+                self._cluster()
+                self.version = version
+            return self.version, self.doc_ids, self.neighbors, self.scores, self.labels
+
+    def get_graph(self, k=None, min_similarity=None):
+        """Nodes with cluster labels and undirected top-k edges"""
+        version, doc_ids, neighbors, scores, labels = self.refresh()
+        k = min(k or self.k, self.k)
+
+        nodes = []
+        for row, doc_id in enumerate(doc_ids.tolist()):
+            doc = get_document(doc_id)
+            nodes.append({
+                "id": doc_id,
+                "filename": doc.filename if doc else None,
+                "type": doc.type if doc else None,
+                "cluster": int(labels[row])
+            })
+
+        edges = {}
+        for row in range(len(doc_ids)):
+            for col, score in zip(neighbors[row, :k].tolist(), scores[row, :k].tolist()):
+                if col < 0 or (min_similarity is not None and score < min_similarity):
+                    continue
+                source, target = sorted((int(doc_ids[row]), int(doc_ids[col])))
+                edges[(source, target)] = max(score, edges.get((source, target), score))
+
+        return {
+            "version": version,
+            "k": k,
+            "nodes": nodes,
+            "edges": [{"source": s, "target": t, "similarity": score} for (s, t), score in edges.items()]
+        }
+
+    def get_clusters(self):
+        """Clusters with their member documents, largest first"""
+        version, doc_ids, _, _, labels = self.refresh()
+
+        members = {}
+        for row, doc_id in enumerate(doc_ids.tolist()):
+            members.setdefault(int(labels[row]), []).append(doc_id)
+
+        clusters = []
+        for cluster_id in sorted(members):
+            doc_ids = members[cluster_id]
+            types = Counter(doc.type for doc in map(get_document, doc_ids) if doc)
+            clusters.append({
+                "id": cluster_id,
+                "size": len(doc_ids),
+                "label": types.most_common(1)[0][0] if types else None,
+                "document_types": dict(types),
+                "doc_ids": doc_ids
+            })
+
+        return {
+            "version": version,
+            "threshold": self.threshold,
+            "clusters": clusters
+        }
+
+similarity_graph = SimilarityGraph()
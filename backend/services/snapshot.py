@@ -0,0 +1,129 @@
+import sys
+import os
+import json
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SNAPSHOT_FORMAT_VERSION, SNAPSHOT_BATCH_SIZE, EMBEDDING_ID
+from models.document import Document
+from services.document_service import vector_store, get_all_documents, get_document, register_document
+
+# Snapshot layout: one directory holding these files
+MANIFEST_FILE = "manifest.json"
+DOCUMENTS_FILE = "documents.jsonl"
+EMBEDDINGS_FILE = "embeddings.npy"
+
+def export_snapshot(path, batch_size=SNAPSHOT_BATCH_SIZE, progress_callback=None):
+    """
+    Write every document and its stored embedding to a snapshot directory.
+    documents.jsonl holds one full document record per line; row i of
+    embeddings.npy is the vector of line i. Documents whose vector is missing
+    from the vector store are skipped with a warning. Returns the manifest.
+    """
+    os.makedirs(path, exist_ok=True)
+    stored_vectors = set(vector_store.get_vector_ids()[0])
+    documents = []
+    skipped = []
+    for doc in sorted(get_all_documents(), key=lambda d: d.id):
+        if doc.vector_id in stored_vectors:
+            documents.append(doc)
+        else:
+            skipped.append(doc.id)
+    if skipped:
+        print(f"Warning: skipping {len(skipped)} documents with no stored vector: {skipped[:20]}")
+
+    embeddings = None
+    with open(os.path.join(path, DOCUMENTS_FILE), 'w', encoding='utf-8') as f:
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start:start + batch_size]
+            vectors = vector_store.get_embeddings([doc.vector_id for doc in batch])
+
+            if embeddings is None:
+                # Written incrementally so the full matrix is never held in memory
+                embeddings = np.lib.format.open_memmap(
+                    os.path.join(path, EMBEDDINGS_FILE), mode='w+', dtype=np.float32,
+                    shape=(len(documents), vectors.shape[1])
+                )
+            embeddings[start:start + len(batch)] = vectors
+
+            for doc in batch:
+                f.write(json.dumps(doc.to_record()) + "\n")
+
+            if progress_callback:
+                progress_callback(start + len(batch), len(documents))
+
+    dimension = 0
+    if embeddings is not None:
+        dimension = embeddings.shape[1]
+        embeddings.flush()
+        del embeddings
+    else:
+        np.save(os.path.join(path, EMBEDDINGS_FILE), np.empty((0, 0), dtype=np.float32))
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "embedding_model": EMBEDDING_ID,
+        "dimension": dimension,
+        "document_count": len(documents),
+        "skipped_document_ids": skipped
+    }
+    with open(os.path.join(path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+def import_snapshot(path, batch_size=SNAPSHOT_BATCH_SIZE, force=False, progress_callback=None):
+    """
+    Restore a snapshot written by export_snapshot.
+    Vectors are bulk-loaded into Chroma with their stored embeddings, so no
+    text is re-embedded. Documents with the same ID are overwritten, and
+    their previous vectors removed.
+    Returns the number of documents imported.
+    """
+    with open(os.path.join(path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest["format_version"] != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version {manifest['format_version']}")
+    if manifest["embedding_model"] != EMBEDDING_ID and not force:
+        raise ValueError(f"Snapshot embeddings were made with {manifest['embedding_model']}, "
+                         f"not {EMBEDDING_ID}; pass force to import anyway")
+
+    total = manifest["document_count"]
+    embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode='r')
+
+    def load_batch(batch, start):
+        for doc in batch:
+            existing = get_document(doc.id)
+            if existing and existing.vector_id and existing.vector_id != doc.vector_id:
+                vector_store.delete_document(existing.vector_id)
+        vector_store.add_embeddings(
+            vector_ids=[doc.vector_id for doc in batch],
+            doc_ids=[doc.id for doc in batch],
+            texts=[doc.text for doc in batch],
+            embeddings=embeddings[start:start + len(batch)],
+            metadatas=[{"filename": doc.filename, "type": doc.type, "summary": doc.summary} for doc in batch],
+            batch_size=batch_size
+        )
+        for doc in batch:
+            register_document(doc)
+        if progress_callback:
+            progress_callback(start + len(batch), total)
+
+    imported = 0
+    batch = []
+    with open(os.path.join(path, DOCUMENTS_FILE), 'r', encoding='utf-8') as f:
+        for line in f:
+            batch.append(Document.from_record(json.loads(line)))
+            if len(batch) == batch_size:
+                load_batch(batch, imported)
+                imported += len(batch)
+                batch = []
+    if batch:
+        load_batch(batch, imported)
+        imported += len(batch)
+
+    return imported
@@ -1,14 +1,125 @@
 import chromadb
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from chromadb.api.types import EmbeddingFunction
 from chromadb.config import Settings
+from chromadb.errors import ChromaError
 from chromadb.utils import embedding_functions
 import os
 import sys
+import re
+import threading
 import uuid
+import zlib
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import CHROMA_PERSIST_DIRECTORY
+from config import CHROMA_PERSIST_DIRECTORY, EMBEDDING_MODEL, EMBEDDING_BACKEND, HASH_EMBEDDING_DIM
+from config import VECTOR_PARTITIONING, VECTOR_FANOUT_WORKERS
+from config import VECTOR_DISTANCE, HNSW_M, HNSW_CONSTRUCTION_EF, HNSW_SEARCH_EF
+
+DEFAULT_COLLECTION = "documents"
+PARTITION_PREFIX = "documents_"
+REBUILD_PREFIX = "rebuild_"
+
+def hnsw_metadata(space=VECTOR_DISTANCE, m=HNSW_M, construction_ef=HNSW_CONSTRUCTION_EF,
+                  search_ef=HNSW_SEARCH_EF):
+    """Collection metadata selecting the distance and HNSW parameters"""
+    return {
+        "hnsw:space": space,
+        "hnsw:M": m,
+        "hnsw:construction_ef": construction_ef,
+        "hnsw:search_ef": search_ef
+    }
+
+def index_settings(collection):
+    """
+    The distance and HNSW parameters a collection was built with.
+    Collections created before these were configurable use Chroma's defaults.
+    """
+    configuration = getattr(collection, "configuration", None)
+    hnsw = configuration.get("hnsw") if isinstance(configuration, dict) else None
+    if hnsw:
+        return {
+            "space": hnsw["space"],
+            "M": hnsw["max_neighbors"],
+            "construction_ef": hnsw["ef_construction"],
+            "search_ef": hnsw["ef_search"]
+        }
+    metadata = collection.metadata or {}
+    return {
+        "space": metadata.get("hnsw:space", "l2"),
+        "M": metadata.get("hnsw:M", 16),
+        "construction_ef": metadata.get("hnsw:construction_ef", 100),
+        "search_ef": metadata.get("hnsw:search_ef", 10)
+    }
+
+def set_search_ef(collection, search_ef):
+    """
+    Change ef_search on an existing collection. It only affects queries, so
+    newer Chroma releases allow it without a rebuild. The value is read when
+    the index is loaded, so call this before the collection is first used.
+    Returns False where the running Chroma version or the collection's index
+    does not support it.
+    """
+    try:
+        collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+    except TypeError:
+        # chromadb before 1.0 has no configuration argument
+        return False
+    except (ValueError, ChromaError) as e:
+        # Rejected configuration, e.g. a collection without an HNSW index
+        print(f"Could not change ef_search on collection {collection.name}: {e}")
+        return False
+    return True
+
+def distance_to_similarity(space, distance):
+    """Map a Chroma distance onto a cosine-like similarity in [0, 1]"""
+    if space == "l2":
+        # Chroma reports squared L2, which is 2 - 2cos for the unit-length embeddings we store
+        distance = distance / 2.0
+    # cosine distance is 1 - cos and ip distance is 1 - dot; float error can
+    # make an exact match's distance slightly negative
+    return 1.0 - min(max(distance, 0.0), 1.0)
+
+class HashEmbeddingFunction(EmbeddingFunction):
+    """
+    Lightweight offline embedding: hashed bag of words, L2-normalized.
+    Meant for load tests and development, not for search quality.
+    """
+    
+    def __init__(self, dim=HASH_EMBEDDING_DIM):
+        self.dim = dim
+    
+    @staticmethod
+    def name():
+        return "hash"
+    
+    def get_config(self):
+        return {"dim": self.dim}
+    
+    @staticmethod
+    def build_from_config(config):
+        return HashEmbeddingFunction(config["dim"])
+    
+    def __call__(self, input):
+        embeddings = []
+        for text in input:
+            vector = np.zeros(self.dim, dtype=np.float32)
+            for token in re.findall(r'\w+', text.lower()):
+                vector[zlib.crc32(token.encode("utf-8")) % self.dim] += 1.0
+            norm = np.linalg.norm(vector)
+            embeddings.append((vector / norm if norm else vector).tolist())
+        return embeddings
 
 class VectorStore:
+    """
+    Chroma-backed vector storage.
+    With VECTOR_PARTITIONING = "doc_type" every document type gets its own
+    collection. Vector IDs are then prefixed with their partition, so any
+    vector can be located without a lookup; unprefixed IDs live in the
+    default "documents" collection.
+    """
+    
     def __init__(self):
         # Create the persistence directory if it doesn't exist
         os.makedirs(CHROMA_PERSIST_DIRECTORY, exist_ok=True)
@@ -17,21 +128,106 @@ class VectorStore:
         self.client = chromadb.PersistentClient(path=CHROMA_PERSIST_DIRECTORY)
         
         # Use sentence-transformers model for embeddings
-        self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
-        )
+        if EMBEDDING_BACKEND == "hash":
+            self.embedding_function = HashEmbeddingFunction()
+        else:
+            self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
+                model_name=EMBEDDING_MODEL
+            )
+        
+        # Vectors re-embedded or overwritten in place since the last call to pop_updated_ids()
+        self._updated_ids = set()
+        self._updated_lock = threading.Lock()
+        
+        self.partitioned = VECTOR_PARTITIONING == "doc_type"
+        self._collections = {}
+        self._spaces = {}
+        self._collections_lock = threading.Lock()
+        
+        # Before anything can create an empty collection in place of one being swapped
+        self._finish_interrupted_rebuilds()
         
         # Get or create collection
-        try:
-            self.collection = self.client.get_collection(
-                name="documents",
-                embedding_function=self.embedding_function
-            )
-        except:
-            self.collection = self.client.create_collection(
-                name="documents",
-                embedding_function=self.embedding_function
-            )
+        self.collection = self._get_collection(DEFAULT_COLLECTION)
+        
+        # Load partitions created by earlier runs
+        for name in self._collection_names():
+            if name.startswith(PARTITION_PREFIX):
+                self._get_collection(name)
+
+    def _collection_names(self):
+        return [c if isinstance(c, str) else c.name for c in self.client.list_collections()]
+
+    def _finish_interrupted_rebuilds(self):
+        """
+        Complete rebuilds that stopped after deleting the original collection
+        but before renaming the finished copy into its place. The original is
+        only deleted once the copy is complete, so the copy is safe to promote.
+        An empty collection standing in for the original is replaced as well.
+        """
+        names = self._collection_names()
+        for name in names:
+            if not name.startswith(REBUILD_PREFIX):
+                continue
+            original = name[len(REBUILD_PREFIX):]
+            copy = self.client.get_collection(name=name, embedding_function=self.embedding_function)
+            if original in names:
+                if copy.count() == 0 or self.client.get_collection(name=original).count() > 0:
+                    # Partial copy; rebuild_collection discards it on the next run
+                    continue
+                self.client.delete_collection(original)
+            print(f"Completing interrupted rebuild of collection {original}")
+            copy.modify(name=original)
+
+    def _get_collection(self, name):
+        """Get or create a collection by name"""
+        with self._collections_lock:
+            if name not in self._collections:
+                # Existing collections keep the settings they were built with;
+                # get_or_create_collection may overwrite their metadata
+                if name in self._collection_names():
+                    collection = self.client.get_collection(
+                        name=name,
+                        embedding_function=self.embedding_function
+                    )
+                else:
+                    collection = self.client.create_collection(
+                        name=name,
+                        embedding_function=self.embedding_function,
+                        metadata=hnsw_metadata()
+                    )
+                if index_settings(collection)["search_ef"] != HNSW_SEARCH_EF:
+                    set_search_ef(collection, HNSW_SEARCH_EF)
+                self._collections[name] = collection
+                self._spaces[name] = index_settings(collection)["space"]
+            return self._collections[name]
+
+    def _partition_for_type(self, doc_type):
+        """Partition name for a document type, or None when not partitioning"""
+        if not self.partitioned:
+            return None
+        return re.sub(r'[^a-z0-9]+', '_', (doc_type or "").lower()).strip('_') or "general"
+
+    def _collection_for_vector(self, vector_id):
+        partition, separator, _ = vector_id.partition(":")
+        if separator:
+            return self._get_collection(PARTITION_PREFIX + partition)
+        return self.collection
+
+    def new_vector_id(self, doc_type):
+        """A fresh vector ID, prefixed with the partition the document type maps to"""
+        partition = self._partition_for_type(doc_type)
+        vector_id = str(uuid.uuid4())
+        return f"{partition}:{vector_id}" if partition else vector_id
+
+    def _vector_metadata(self, doc_id, metadata):
+        """Metadata stored alongside each vector"""
+        return {
+            "doc_id": str(doc_id),
+            "filename": metadata.get("filename", ""),
+            "doc_type": metadata.get("type", ""),
+            "summary": metadata.get("summary", "")
+        }
 
     def add_document(self, doc_id, text, metadata):
         """
@@ -39,21 +235,16 @@ class VectorStore:
         Returns the unique vector ID
         """
         # Generate a unique ID for the vector
-        vector_id = str(uuid.uuid4())
+        vector_id = self.new_vector_id(metadata.get("type"))
         
         # Extract text snippet for embedding (limit length)
         text_for_embedding = text[:8000]  # Limit for performance
         
         # Add document metadata
-        doc_metadata = {
-            "doc_id": str(doc_id),
-            "filename": metadata.get("filename", ""),
-            "doc_type": metadata.get("type", ""),
-            "summary": metadata.get("summary", "")
-        }
+        doc_metadata = self._vector_metadata(doc_id, metadata)
         
         # Add document to collection
-        self.collection.add(
+        self._collection_for_vector(vector_id).add(
             ids=[vector_id],
             documents=[text_for_embedding],
             metadatas=[doc_metadata]
@@ -61,22 +252,149 @@ class VectorStore:
         
         return vector_id
 
-    def search_similar(self, query_text, limit=5):
+    def add_documents(self, doc_ids, texts, metadatas, vector_ids=None):
         """
-        Search for documents similar to the query text
+        Add many documents with one embedding call per collection
+        Vectors are upserted, so repeating a call with the same vector_ids is harmless
+        Returns the vector IDs in input order
+        """
+        if vector_ids is None:
+            vector_ids = [self.new_vector_id(metadata.get("type")) for metadata in metadatas]
+        
+        by_collection = {}
+        for i, vector_id in enumerate(vector_ids):
+            by_collection.setdefault(self._collection_for_vector(vector_id).name, []).append(i)
+        
+        for name, indexes in by_collection.items():
+            self._get_collection(name).upsert(
+                ids=[vector_ids[i] for i in indexes],
+                documents=[texts[i][:8000] for i in indexes],
+                metadatas=[self._vector_metadata(doc_ids[i], metadatas[i]) for i in indexes]
+            )
+        
+        return vector_ids
+
+    def _needs_move(self, vector_id, doc_type):
+        """Whether a vector is in a different partition than its (new) document type requires"""
+        partition = self._partition_for_type(doc_type)
+        return partition is not None and not vector_id.startswith(partition + ":")
+
+    def update_document(self, vector_id, doc_id, text, metadata):
+        """
+        Re-embed an existing vector in place, keeping its vector ID
+        If the document type moved it to another partition, the vector gets a new ID
+        Returns the vector ID
+        """
+        if self._needs_move(vector_id, metadata.get("type")):
+            self.delete_document(vector_id)
+            vector_id = self.add_document(doc_id, text, metadata)
+        else:
+            self._collection_for_vector(vector_id).upsert(
+                ids=[vector_id],
+                documents=[text[:8000]],
+                metadatas=[self._vector_metadata(doc_id, metadata)]
+            )
+        with self._updated_lock:
+            self._updated_ids.add(vector_id)
+        
+        return vector_id
+
+    def pop_updated_ids(self):
+        """Return and reset the IDs of vectors re-embedded or overwritten in place"""
+        with self._updated_lock:
+            updated = self._updated_ids
+            self._updated_ids = set()
+        return updated
+
+    def get_vector_ids(self, batch_size=5000):
+        """
+        List every stored vector without loading embeddings
+        Returns (vector_ids, doc_ids)
+        """
+        vector_ids, doc_ids = [], []
+        for collection in list(self._collections.values()):
+            offset = 0
+            while True:
+                results = collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+                if not results['ids']:
+                    break
+                vector_ids.extend(results['ids'])
+                doc_ids.extend(int(metadata["doc_id"]) for metadata in results['metadatas'])
+                offset += len(results['ids'])
+        return vector_ids, doc_ids
+
+    def get_embeddings(self, vector_ids, batch_size=1000):
         """
-        results = self.collection.query(
-            query_texts=[query_text],
-            n_results=limit
+        Fetch stored embeddings as a float32 matrix, one row per vector ID in the given order
+        """
+        by_collection = {}
+        for id in vector_ids:
+            by_collection.setdefault(self._collection_for_vector(id).name, []).append(id)
+        
+        rows = {}
+        for name, ids in by_collection.items():
+            collection = self._get_collection(name)
+            for start in range(0, len(ids), batch_size):
+                results = collection.get(ids=ids[start:start + batch_size], include=["embeddings"])
+                for id, embedding in zip(results['ids'], results['embeddings']):
+                    rows[id] = embedding
+        
+        if not vector_ids:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.asarray([rows[id] for id in vector_ids], dtype=np.float32)
+
+    def update_metadata(self, vector_id, doc_id, metadata):
+        """
+        Update the stored metadata of a vector without re-embedding it
+        Returns the vector ID, which changes if the vector moved partitions
+        """
+        if self._needs_move(vector_id, metadata.get("type")):
+            # Carry the stored embedding over to the new partition
+            embedding = self.get_embeddings([vector_id])
+            text = self._collection_for_vector(vector_id).get(ids=[vector_id], include=["documents"])['documents'][0]
+            new_vector_id = self.new_vector_id(metadata.get("type"))
+            self.add_embeddings([new_vector_id], [doc_id], [text], embedding, [metadata])
+            self.delete_document(vector_id)
+            return new_vector_id
+        
+        self._collection_for_vector(vector_id).update(
+            ids=[vector_id],
+            metadatas=[self._vector_metadata(doc_id, metadata)]
         )
+        return vector_id
+
+    def add_embeddings(self, vector_ids, doc_ids, texts, embeddings, metadatas, batch_size=1000):
+        """
+        Bulk-load precomputed embeddings without running the embedding model
+        Existing vectors with the same IDs are overwritten and reported by pop_updated_ids()
+        """
+        by_collection = {}
+        for i, vector_id in enumerate(vector_ids):
+            by_collection.setdefault(self._collection_for_vector(vector_id).name, []).append(i)
+        
+        for name, indexes in by_collection.items():
+            collection = self._get_collection(name)
+            for start in range(0, len(indexes), batch_size):
+                batch = indexes[start:start + batch_size]
+                collection.upsert(
+                    ids=[vector_ids[i] for i in batch],
+                    embeddings=[list(map(float, embeddings[i])) for i in batch],
+                    documents=[texts[i][:8000] for i in batch],
+                    metadatas=[self._vector_metadata(doc_ids[i], metadatas[i]) for i in batch]
+                )
         
+        # Upserts may have replaced vectors in place; new IDs are harmless here
+        with self._updated_lock:
+            self._updated_ids.update(vector_ids)
+
+    def _format_results(self, results, space):
         search_results = []
         if results['ids'] and len(results['ids'][0]) > 0:
             for i, id in enumerate(results['ids'][0]):
                 metadata = results['metadatas'][0][i]
                 score = results['distances'][0][i] if 'distances' in results else 0.0
                 # Convert distance to similarity score (ChromaDB returns distances)
-                similarity = 1.0 - min(score, 1.0)
+                similarity = distance_to_similarity(space, score)
                 
                 search_results.append({
                     "vector_id": id,
@@ -86,42 +404,140 @@ class VectorStore:
                     "doc_type": metadata["doc_type"],
                     "summary": metadata["summary"]
                 })
-        
         return search_results
+
+    def _query(self, query_text, limit, where=None, doc_type=None):
+        """
+        Top matches for the query text across the relevant collections.
+        A type-scoped query in partitioned mode only touches that type's
+        partition (plus the default collection if it still holds vectors);
+        otherwise every collection is queried in parallel and the results
+        merged by score. Partitions left by an earlier partitioned run are
+        still searched after partitioning is switched off.
+        """
+        if doc_type is not None:
+            type_filter = {"doc_type": doc_type}
+            where = {"$and": [where, type_filter]} if where else type_filter
+        
+        if self.partitioned and doc_type is not None:
+            # Reads never create collections; an unknown type has no partition
+            with self._collections_lock:
+                partition = self._collections.get(PARTITION_PREFIX + self._partition_for_type(doc_type))
+            collections = [partition, self.collection]
+        else:
+            with self._collections_lock:
+                collections = list(self._collections.values())
+        collections = [c for c in collections if c is not None and c.count() > 0]
+        if not collections:
+            return []
+        
+        if len(collections) == 1:
+            collection = collections[0]
+            return self._format_results(collection.query(
+                query_texts=[query_text],
+                n_results=min(limit, collection.count()),
+                where=where
+            ), self._spaces[collection.name])
+        
+        # Embed once and reuse the vector for every partition
+        query_embedding = [list(map(float, self.embedding_function([query_text])[0]))]
+        
+        def query_partition(collection):
+            return self._format_results(collection.query(
+                query_embeddings=query_embedding,
+                n_results=min(limit, collection.count()),
+                where=where
+            ), self._spaces[collection.name])
+        
+        with ThreadPoolExecutor(max_workers=min(VECTOR_FANOUT_WORKERS, len(collections))) as executor:
+            merged = [result for results in executor.map(query_partition, collections) for result in results]
+        
+        merged.sort(key=lambda result: result["score"], reverse=True)
+        return merged[:limit]
+
+    def search_similar(self, query_text, limit=5, doc_type=None):
+        """
+        Search for documents similar to the query text
+        """
+        return self._query(query_text, limit, doc_type=doc_type)
     
-    def find_related(self, doc_id, doc_text, limit=5):
+    def find_related(self, doc_id, doc_text, limit=5, doc_type=None):
         """Find documents related to the given document"""
         # Use the document text to find similar documents
-        results = self.collection.query(
-            query_texts=[doc_text[:8000]],  # Limit text for performance
-            n_results=limit + 1,  # Get extra to filter out the document itself
-            where={"doc_id": {"$ne": str(doc_id)}}  # Exclude the current document
+        search_results = self._query(
+            doc_text[:8000],  # Limit text for performance
+            limit + 1,  # Get extra to filter out the document itself
+            where={"doc_id": {"$ne": str(doc_id)}},  # Exclude the current document
+            doc_type=doc_type
         )
         
-        search_results = []
-        if results['ids'] and len(results['ids'][0]) > 0:
-            for i, id in enumerate(results['ids'][0]):
-                metadata = results['metadatas'][0][i]
-                score = results['distances'][0][i] if 'distances' in results else 0.0
-                # Convert distance to similarity score
-                similarity = 1.0 - min(score, 1.0)
-                
-                search_results.append({
-                    "vector_id": id,
-                    "doc_id": int(metadata["doc_id"]),
-                    "filename": metadata["filename"],
-                    "score": similarity,
-                    "doc_type": metadata["doc_type"],
-                    "summary": metadata["summary"]
-                })
-        
         return search_results[:limit]
     
+    def stale_collections(self):
+        """Collections whose distance or HNSW parameters differ from the configuration"""
+        target = {
+            "space": VECTOR_DISTANCE,
+            "M": HNSW_M,
+            "construction_ef": HNSW_CONSTRUCTION_EF,
+            "search_ef": HNSW_SEARCH_EF
+        }
+        return [name for name, collection in list(self._collections.items())
+                if index_settings(collection) != target]
+
+    def rebuild_collection(self, name, batch_size=1000, progress_callback=None):
+        """
+        Recreate a collection with the configured distance and HNSW parameters.
+        Stored embeddings are copied into a new collection, so nothing is
+        re-embedded, and the new collection then replaces the old one.
+        Run with the API server stopped. A rebuild interrupted while copying
+        leaves the original in place and can simply be rerun; one interrupted
+        between deleting the original and renaming the copy is completed the
+        next time a VectorStore is created.
+        Returns the number of vectors copied.
+        """
+        source = self._get_collection(name)
+        temp_name = REBUILD_PREFIX + name
+        
+        # The original still exists, so a leftover copy is a partial one from an interrupted run
+        if temp_name in self._collection_names():
+            self.client.delete_collection(temp_name)
+        target = self.client.create_collection(
+            name=temp_name,
+            embedding_function=self.embedding_function,
+            metadata=hnsw_metadata()
+        )
+        
+        total = source.count()
+        copied = 0
+        while True:
+            results = source.get(include=["embeddings", "documents", "metadatas"],
+                                 limit=batch_size, offset=copied)
+            if not results['ids']:
+                break
+            target.add(
+                ids=results['ids'],
+                embeddings=results['embeddings'],
+                documents=results['documents'],
+                metadatas=results['metadatas']
+            )
+            copied += len(results['ids'])
+            if progress_callback:
+                progress_callback(copied, total)
+        
+        self.client.delete_collection(name)
+        target.modify(name=name)
+        with self._collections_lock:
+            self._collections[name] = target
+            self._spaces[name] = index_settings(target)["space"]
+        if name == DEFAULT_COLLECTION:
+            self.collection = target
+        return copied
+
     def delete_document(self, vector_id):
         """Delete a document from the vector store"""
         try:
-            self.collection.delete(ids=[vector_id])
+            self._collection_for_vector(vector_id).delete(ids=[vector_id])
             return True
         except Exception as e:
             print(f"Error deleting document from vector store: {e}")
-            return False
\ No newline at end of file
+            return False
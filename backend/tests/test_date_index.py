@@ -0,0 +1,41 @@
+from services import date_index as date_index_module
+from services.date_index import DateIndex, normalize_date, normalize_dates
+
+def test_normalize_numeric_dates_month_first():
+    assert normalize_date("3/4/2022") == "2022-03-04"
+    assert normalize_date("03-04-22") == "2022-03-04"
+    assert normalize_date("12.31.99") == "1999-12-31"
+
+def test_normalize_numeric_dates_day_first(monkeypatch):
+    monkeypatch.setattr(date_index_module, "DATE_ORDER", "DMY")
+    assert normalize_date("3/4/2022") == "2022-04-03"
+
+def test_normalize_textual_dates():
+    assert normalize_date("January 5, 2023") == "2023-01-05"
+    assert normalize_date("Jan 5 2023") == "2023-01-05"
+
+def test_invalid_dates_are_dropped():
+    assert normalize_date("13/45/2022") is None
+    assert normalize_date("1/2/202") is None
+    assert normalize_date("not a date") is None
+    assert normalize_dates(["1/2/2023", "01/02/2023", "bogus", "Jan 1, 2023"]) == ["2023-01-01", "2023-01-02"]
+
+def test_range_query_is_inclusive_and_deduplicated():
+    index = DateIndex()
+    index.add(1, ["2023-01-01", "2023-06-01"])
+    index.add(2, ["2023-03-15"])
+    index.add(3, ["2024-01-01"])
+    assert index.query("2023-01-01", "2023-06-01") == [1, 2]
+    assert index.query(date_from="2023-03-15") == [2, 1, 3]
+    assert index.query(date_to="2023-01-01") == [1]
+    assert index.query() == [1, 2, 3]
+
+def test_add_replaces_and_remove_drops_dates():
+    index = DateIndex()
+    index.add(1, ["2023-01-01"])
+    index.add(1, ["2023-02-01"])
+    assert index.query("2023-01-01", "2023-01-31") == []
+    assert index.query("2023-02-01", "2023-02-01") == [1]
+    index.remove(1)
+    assert index.query() == []
+    assert index.entries == []
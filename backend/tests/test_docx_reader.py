@@ -0,0 +1,51 @@
+import zipfile
+
+from utils.docx_reader import extract_docx_text, iter_docx_blocks
+
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+def _paragraph(*runs, properties=""):
+    return f"<w:p>{properties}" + "".join(f"<w:r>{run}</w:r>" for run in runs) + "</w:p>"
+
+def _text(value):
+    return f'<w:t xml:space="preserve">{value}</w:t>'
+
+def _table(*rows):
+    return "<w:tbl>" + "".join(
+        "<w:tr>" + "".join(f"<w:tc>{cell}</w:tc>" for cell in row) + "</w:tr>" for row in rows
+    ) + "</w:tbl>"
+
+def _write_docx(path, body):
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr("word/document.xml",
+                         f'<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w="{W_NAMESPACE}">'
+                         f'<w:body>{body}</w:body></w:document>')
+    return str(path)
+
+def test_paragraphs_and_runs(tmp_path):
+    path = _write_docx(tmp_path / "a.docx",
+                       _paragraph(_text("Hello "), _text("world")) + _paragraph() + _paragraph(_text("Bye")))
+    assert list(iter_docx_blocks(path)) == ["Hello world", "", "Bye"]
+    assert extract_docx_text(path) == "Hello world\n\nBye"
+
+def test_tables_become_tab_separated_rows(tmp_path):
+    body = _paragraph(_text("Items")) + _table(
+        [_paragraph(_text("Widget")), _paragraph(_text("2"))],
+        [_paragraph(_text("Gadget")) + _paragraph(_text("blue")), _paragraph(_text("5"))]
+    ) + _paragraph(_text("Total"))
+    path = _write_docx(tmp_path / "t.docx", body)
+    assert list(iter_docx_blocks(path)) == ["Items", "Widget\t2", "Gadget blue\t5", "Total"]
+
+def test_nested_table_rows_stay_in_their_cell(tmp_path):
+    inner = _table([_paragraph(_text("a")), _paragraph(_text("b"))])
+    path = _write_docx(tmp_path / "n.docx", _table([inner, _paragraph(_text("c"))]))
+    assert list(iter_docx_blocks(path)) == ["a\tb\tc"]
+
+def test_tabs_and_breaks_inside_runs(tmp_path):
+    path = _write_docx(tmp_path / "b.docx", _paragraph(_text("a") + "<w:tab/>" + _text("b") + "<w:br/>" + _text("c")))
+    assert list(iter_docx_blocks(path)) == ["a\tb\nc"]
+
+def test_tab_stop_definitions_are_not_text(tmp_path):
+    properties = '<w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/><w:tab w:val="right" w:pos="9000"/></w:tabs></w:pPr>'
+    path = _write_docx(tmp_path / "s.docx", _paragraph(_text("Name") + "<w:tab/>" + _text("Value"), properties=properties))
+    assert list(iter_docx_blocks(path)) == ["Name\tValue"]
@@ -0,0 +1,71 @@
+from services.entity_index import EntityIndex, normalize_entity, JOURNAL_FILE
+
+def _entity(text, entity_type="ORG"):
+    return {"text": text, "type": entity_type}
+
+def _reloaded(directory):
+    index = EntityIndex(directory=str(directory))
+    index.load()
+    return index
+
+def test_normalize_entity():
+    assert normalize_entity("  Acme   Corp. ") == "acme corp"
+    assert normalize_entity("ACME CORP") == normalize_entity("acme corp")
+
+def test_search_orders_by_document_count(tmp_path):
+    index = EntityIndex(directory=str(tmp_path))
+    index.add(1, [_entity("Acme Corp"), _entity("Bob", "PERSON")])
+    index.add(2, [_entity("acme corp."), _entity("Beta LLC")])
+    entities, total = index.search()
+    assert total == 3
+    assert entities[0] == {"text": "Acme Corp", "type": "ORG", "document_count": 2, "mention_count": 2}
+    assert [e["text"] for e in index.search(prefix="b")[0]] == ["Beta LLC", "Bob"]
+
+def test_type_matching_is_case_insensitive(tmp_path):
+    index = EntityIndex(directory=str(tmp_path))
+    index.add(1, [_entity("Acme Corp")])
+    entities, total = index.search(entity_type="org")
+    assert total == 1 and entities[0]["type"] == "ORG"
+    assert index.documents_for("Org", "ACME CORP") == ([1], 1)
+
+def test_ranking_follows_changes(tmp_path):
+    index = EntityIndex(directory=str(tmp_path))
+    index.add(1, [_entity("Acme Corp"), _entity("Beta LLC")])
+    index.add(2, [_entity("Beta LLC")])
+    assert index.top_entities(limit=1)[0]["text"] == "Beta LLC"
+    index.remove(2)
+    index.add(3, [_entity("Acme Corp")])
+    assert index.top_entities(limit=1)[0]["text"] == "Acme Corp"
+
+def test_journal_replay_restores_index(tmp_path):
+    index = EntityIndex(directory=str(tmp_path))
+    index.add(1, [_entity("Acme Corp"), _entity("Acme Corp")])
+    index.add(2, [_entity("Beta LLC")])
+    index.add(1, [_entity("Gamma Inc")])
+    index.remove(2)
+    reloaded = _reloaded(tmp_path)
+    assert reloaded.search() == index.search()
+    assert reloaded.documents_for("ORG", "acme corp") is None
+
+def test_replay_after_compaction(tmp_path):
+    index = EntityIndex(directory=str(tmp_path), compact_every=3)
+    for doc_id in range(1, 6):
+        index.add(doc_id, [_entity("Acme Corp"), _entity(f"Vendor {doc_id}")])
+    index.remove(4)
+    reloaded = _reloaded(tmp_path)
+    assert reloaded.search(limit=100) == index.search(limit=100)
+    assert reloaded.documents_for("ORG", "Acme Corp") == ([1, 2, 3, 5], 4)
+
+def test_torn_journal_line_is_ignored(tmp_path):
+    index = EntityIndex(directory=str(tmp_path))
+    index.add(1, [_entity("Acme Corp")])
+    with open(tmp_path / JOURNAL_FILE, 'a', encoding='utf-8') as f:
+        f.write('{"op": "add", "doc_id": 2, "entit')
+    reloaded = _reloaded(tmp_path)
+    assert reloaded.search() == index.search()
+
+def test_unchanged_entities_are_not_journaled(tmp_path):
+    index = EntityIndex(directory=str(tmp_path))
+    index.add(1, [_entity("Acme Corp")])
+    index.add(1, [_entity("Acme Corp")])
+    assert len((tmp_path / JOURNAL_FILE).read_text().splitlines()) == 1
@@ -0,0 +1,31 @@
+from config import PIPELINE_VERSIONS, EXTRACTION_FORMAT_VERSIONS
+from models.document import Document
+from services.pipeline import PIPELINE_STAGES, pipeline_versions_for, get_stale_stages
+
+def _document(filepath, versions):
+    return Document(id=1, filename="f", filepath=filepath, doc_type="other", metadata={},
+                    summary="", text="", pipeline_versions=versions)
+
+def test_formats_without_their_own_version_use_the_base():
+    assert pipeline_versions_for("/docs/notes.txt") == PIPELINE_VERSIONS
+
+def test_format_version_is_appended_to_extraction():
+    versions = pipeline_versions_for("/docs/Report.DOCX")
+    assert versions["extraction"] == f"{PIPELINE_VERSIONS['extraction']}:docx{EXTRACTION_FORMAT_VERSIONS['docx']}"
+    assert {stage: versions[stage] for stage in PIPELINE_STAGES if stage != "extraction"} == \
+        {stage: PIPELINE_VERSIONS[stage] for stage in PIPELINE_STAGES if stage != "extraction"}
+
+def test_current_document_has_no_stale_stages():
+    assert get_stale_stages(_document("/docs/a.docx", pipeline_versions_for("/docs/a.docx"))) == []
+
+def test_format_bump_only_stales_extraction_of_that_format():
+    base = dict(PIPELINE_VERSIONS)
+    assert get_stale_stages(_document("/docs/a.docx", base)) == ["extraction"]
+    assert get_stale_stages(_document("/docs/a.txt", base)) == []
+
+def test_missing_versions_are_stale_in_stage_order():
+    versions = pipeline_versions_for("/docs/a.txt")
+    del versions["summary"]
+    versions["metadata"] = "0"
+    assert get_stale_stages(_document("/docs/a.txt", versions)) == ["metadata", "summary"]
+    assert get_stale_stages(_document("/docs/a.txt", {})) == PIPELINE_STAGES
@@ -0,0 +1,45 @@
+import re
+
+from utils.text_windows import iter_windows
+
+def _words(count):
+    return " ".join(f"word{i}" for i in range(count))
+
+def test_owned_ranges_cover_text_exactly_once():
+    text = _words(500)
+    windows = list(iter_windows(text, size=200, overlap=40))
+    assert windows[0][1] == 0
+    assert windows[-1][2] == len(text)
+    for (_, _, previous_end, _), (_, own_start, _, _) in zip(windows, windows[1:]):
+        assert own_start == previous_end
+
+def test_window_contains_its_owned_range_with_context():
+    text = _words(500)
+    for start, own_start, own_end, window in iter_windows(text, size=200, overlap=40):
+        assert start <= own_start < own_end
+        assert window == text[start:start + len(window)]
+        assert start + len(window) >= own_end
+
+def test_boundaries_never_split_words():
+    text = _words(500)
+    for _, own_start, own_end, _ in iter_windows(text, size=200, overlap=40):
+        if own_end < len(text):
+            assert text[own_end] == " "
+
+def test_matches_are_kept_once_by_their_owner():
+    text = _words(500)
+    found = []
+    for start, own_start, own_end, window in iter_windows(text, size=200, overlap=40):
+        for match in re.finditer(r'word\d+', window):
+            if own_start <= start + match.start() < own_end:
+                found.append(match.group())
+    assert found == text.split()
+
+def test_text_without_whitespace_is_cut_at_the_step():
+    text = "x" * 1000
+    windows = list(iter_windows(text, size=200, overlap=40))
+    assert [own_end for _, _, own_end, _ in windows][:2] == [160, 320]
+    assert windows[-1][2] == len(text)
+
+def test_empty_text_has_no_windows():
+    assert list(iter_windows("", size=200, overlap=40)) == []
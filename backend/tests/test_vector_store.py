@@ -0,0 +1,19 @@
+import pytest
+
+from services.vector_store import distance_to_similarity
+
+@pytest.mark.parametrize("space", ["cosine", "ip"])
+def test_one_minus_distance(space):
+    assert distance_to_similarity(space, 0.0) == 1.0
+    assert distance_to_similarity(space, 0.25) == pytest.approx(0.75)
+    assert distance_to_similarity(space, 1.0) == 0.0
+
+def test_squared_l2_of_unit_vectors():
+    # |a - b|^2 = 2 - 2cos for unit vectors
+    assert distance_to_similarity("l2", 0.5) == pytest.approx(0.75)
+    assert distance_to_similarity("l2", 2.0) == 0.0
+
+@pytest.mark.parametrize("space", ["cosine", "ip", "l2"])
+def test_clamped_to_unit_interval(space):
+    assert distance_to_similarity(space, -1e-7) == 1.0
+    assert distance_to_similarity(space, 5.0) == 0.0
@@ -0,0 +1,72 @@
+import zipfile
+import xml.etree.ElementTree as ET
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DOCUMENT_PART = "word/document.xml"
+
+def iter_docx_blocks(file_path):
+    """
+    Yield the text of a .docx body in document order: one string per
+    paragraph and one tab-separated string per table row.
+    word/document.xml is parsed incrementally and every finished block is
+    dropped from the tree, so memory stays proportional to one block rather
+    than the whole document.
+    """
+    with zipfile.ZipFile(file_path) as archive, archive.open(DOCUMENT_PART) as xml_file:
+        body = None
+        depth = 0
+        in_run = 0      # w:tab also defines tab stops under w:pPr; only tabs inside runs are text
+        runs = []       # text pieces of the paragraph being read
+        cells = []      # stack of open table cells, each a list of paragraph texts
+        rows = []       # stack of open table rows, each a list of cell texts
+
+        for event, elem in ET.iterparse(xml_file, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                depth += 1
+                if tag == W + "body":
+                    body = elem
+                elif tag == W + "r":
+                    in_run += 1
+                elif tag == W + "tr":
+                    rows.append([])
+                elif tag == W + "tc":
+                    cells.append([])
+                continue
+
+            depth -= 1
+            if tag == W + "r":
+                in_run -= 1
+            elif tag == W + "t":
+                runs.append(elem.text or "")
+            elif tag == W + "tab" and in_run:
+                runs.append("\t")
+            elif tag in (W + "br", W + "cr") and in_run:
+                runs.append("\n")
+            elif tag == W + "p":
+                text = "".join(runs)
+                runs = []
+                elem.clear()
+                if cells:
+                    cells[-1].append(text)
+                else:
+                    yield text
+            elif tag == W + "tc":
+                text = " ".join(part for part in cells.pop() if part)
+                if rows:
+                    rows[-1].append(text)
+            elif tag == W + "tr":
+                text = "\t".join(rows.pop())
+                elem.clear()
+                if cells:
+                    # Row of a table nested inside a cell
+                    cells[-1].append(text)
+                else:
+                    yield text
+
+            # Back at body depth: a top-level paragraph or table just closed
+            if depth == 2 and body is not None:
+                body.clear()
+
+def extract_docx_text(file_path):
+    return "\n".join(iter_docx_blocks(file_path))
@@ -6,7 +6,9 @@ from werkzeug.utils import secure_filename
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import ALLOWED_EXTENSIONS, UPLOAD_FOLDER
+from config import ALLOWED_EXTENSIONS, UPLOAD_FOLDER, PDF_MAX_OCR_PAGES, OCR_MAX_PIXELS, OCR_DPI
+from services.admission import stage_slot
+from utils.docx_reader import extract_docx_text
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -19,24 +21,77 @@ def save_file(file):
     file.save(filepath)
     return filepath, filename
 
-def extract_text(file_path):
-    """Extract text from various file formats"""
+def _ocr_image(image, budget=None):
+    """
+    OCR an image within the extraction budget.
+    Oversized images are downscaled first; returns None if OCR was skipped.
+    """
+    if budget and budget.exhausted("extraction"):
+        return None
+    
+    if image.width * image.height > OCR_MAX_PIXELS:
+        scale = (OCR_MAX_PIXELS / (image.width * image.height)) ** 0.5
+        original_size = image.size
+        image = image.resize((int(image.width * scale), int(image.height * scale)))
+        if budget:
+            budget.record("extraction", "image_downscaled", original_size=list(original_size))
+    
+    with stage_slot("ocr"):
+        timeout = max(budget.remaining("extraction"), 1) if budget else 0
+        try:
+            return pytesseract.image_to_string(image, timeout=timeout)
+        except RuntimeError:
+            # pytesseract raises RuntimeError when the timeout kills tesseract
+            return None
+
+def _extract_pdf_text(file_path, budget=None):
+    """Extract PDF text, OCR-ing pages without a text layer while the budget allows"""
+    text = ""
+    ocr_pages = 0
+    skipped_pages = []
+    with fitz.open(file_path) as doc:
+        for page in doc:
+            if budget and budget.exhausted("extraction"):
+                skipped_pages.append(page.number)
+                continue
+            
+            page_text = page.get_text()
+            if not page_text.strip():
+                # Scanned page: fall back to OCR
+                if ocr_pages >= PDF_MAX_OCR_PAGES:
+                    skipped_pages.append(page.number)
+                    continue
+                pixmap = page.get_pixmap(dpi=OCR_DPI)
+                image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+                ocr_pages += 1
+                page_text = _ocr_image(image, budget)
+                if page_text is None:
+                    skipped_pages.append(page.number)
+                    continue
+            text += page_text
+    
+    if skipped_pages and budget:
+        budget.record("extraction", "pages_skipped", pages=skipped_pages)
+    return text
+
+def extract_text(file_path, budget=None):
+    """
+    Extract text from various file formats.
+    When a ProcessingBudget is given, OCR stops once the extraction budget is
+    spent and whatever was skipped is recorded on the budget.
+    """
     if file_path.endswith('.pdf'):
-        text = ""
-        with fitz.open(file_path) as doc:
-            for page in doc:
-                text += page.get_text()
-        return text
+        return _extract_pdf_text(file_path, budget)
     elif file_path.endswith(('.png', '.jpg', '.jpeg')):
-        return pytesseract.image_to_string(Image.open(file_path))
+        text = _ocr_image(Image.open(file_path), budget)
+        if text is None:
+            if budget:
+                budget.record("extraction", "ocr_skipped")
+            return ""
+        return text
     elif file_path.endswith('.txt'):
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             return f.read()
     elif file_path.endswith('.docx'):
-        try:
-            import docx
-            doc = docx.Document(file_path)
-            return "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        except ImportError:
-            return "DOCX support requires python-docx library."
+        return extract_docx_text(file_path)
     return ""
\ No newline at end of file
@@ -0,0 +1,65 @@
+import gzip
+import json
+import os
+import sys
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import COMPRESS_RESPONSES, COMPRESSION_MIN_BYTES, COMPRESSION_LEVEL
+
+class JSONFragment(bytes):
+    """Already-serialized JSON, spliced verbatim into responses built by dumps()"""
+
+def _encode(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def dumps(obj):
+    """Serialize obj to JSON bytes, inserting JSONFragment values as-is"""
+    if isinstance(obj, JSONFragment):
+        return obj
+    if isinstance(obj, dict):
+        return b"{" + b",".join(_encode(str(key)) + b":" + dumps(value) for key, value in obj.items()) + b"}"
+    if isinstance(obj, (list, tuple)):
+        return b"[" + b",".join(dumps(item) for item in obj) + b"]"
+    return _encode(obj)
+
+def _accepted_encoding():
+    accepted = request.headers.get("Accept-Encoding", "")
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+def json_response(payload, status=200):
+    """
+    Build a JSON response with the fast encoder.
+    Large bodies are compressed when the client accepts br or gzip.
+    """
+    body = dumps(payload)
+    response = Response(body, status=status, mimetype="application/json")
+    
+    if COMPRESS_RESPONSES and len(body) >= COMPRESSION_MIN_BYTES:
+        encoding = _accepted_encoding()
+        if encoding == "br":
+            response.set_data(brotli.compress(body, quality=COMPRESSION_LEVEL))
+        elif encoding == "gzip":
+            response.set_data(gzip.compress(body, compresslevel=COMPRESSION_LEVEL))
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+    
+    return response
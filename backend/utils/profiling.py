@@ -0,0 +1,128 @@
+import cProfile
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+from flask import g, request
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (PROFILING_ENABLED, PROFILING_HEADER, PROFILING_SAMPLE_RATE, PROFILING_DIRECTORY,
+                    PROFILING_MAX_BYTES)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Client request IDs end up in profile filenames, so only plain tokens are accepted
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+# cProfile can only have one active profiler per thread, and concurrent
+# profilers would pollute each other's stats, so profile one request at a time
+_profile_lock = threading.Lock()
+_prune_lock = threading.Lock()
+
+def _collapsed_stacks(stats):
+    """
+    Flamegraph-compatible collapsed stacks built from caller edges.
+    cProfile records one level of callers, so each line is a caller;callee
+    pair weighted by the callee's inclusive time in microseconds.
+    """
+    lines = []
+    for (filename, lineno, name), (_, _, _, _, callers) in stats.stats.items():
+        callee = f"{name} ({os.path.basename(filename)}:{lineno})"
+        for (caller_file, caller_line, caller_name), caller_stats in callers.items():
+            caller = f"{caller_name} ({os.path.basename(caller_file)}:{caller_line})"
+            micros = int(caller_stats[3] * 1_000_000)
+            if micros > 0:
+                lines.append(f"{caller};{callee} {micros}")
+    return "\n".join(lines) + "\n"
+
+def _prune(directory, max_bytes):
+    """Delete the oldest profiles until the directory fits in max_bytes"""
+    with _prune_lock:
+        entries = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+def _should_profile():
+    if request.headers.get(PROFILING_HEADER) == "1":
+        return True
+    return PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE
+
+def _assign_request_id():
+    # Every response carries a request ID so a profile or log line can be matched
+    # to its request; IDs that are not plain tokens are replaced with a generated one
+    request_id = request.headers.get(REQUEST_ID_HEADER, "")
+    g.request_id = request_id if REQUEST_ID_PATTERN.fullmatch(request_id) else uuid.uuid4().hex
+
+def _echo_request_id(response):
+    if "request_id" in g:
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+    return response
+
+def _start_profile():
+    g.profiler = None
+    if not _should_profile() or not _profile_lock.acquire(blocking=False):
+        return
+    g.profiler = cProfile.Profile()
+    g.profile_started = time.time()
+    g.profiler.enable()
+
+def _finish_profile(response):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return response
+
+    profiler.disable()
+    _profile_lock.release()
+
+    os.makedirs(PROFILING_DIRECTORY, exist_ok=True)
+    endpoint = re.sub(r'[^A-Za-z0-9_]+', '_', request.endpoint or request.path).strip('_')
+    base = os.path.join(PROFILING_DIRECTORY, f"{int(g.profile_started)}_{endpoint}_{g.request_id}")
+
+    stats = pstats.Stats(profiler)
+    stats.dump_stats(base + ".pstats")
+    with open(base + ".collapsed", 'w', encoding='utf-8') as f:
+        f.write(_collapsed_stacks(stats))
+    _prune(PROFILING_DIRECTORY, PROFILING_MAX_BYTES)
+
+    response.headers["X-Profile-Id"] = os.path.basename(base)
+    return response
+
+def _abort_profile(exc):
+    # Release the profiler if the request failed before a response was built
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        _profile_lock.release()
+
+def init_profiling(app):
+    """
+    Register request IDs and the opt-in request profiler on the app.
+    Every response gets an X-Request-ID header; profiling hooks are only
+    registered when PROFILING_ENABLED is set.
+    """
+    app.before_request(_assign_request_id)
+    app.after_request(_echo_request_id)
+    if not PROFILING_ENABLED:
+        return
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abort_profile)
@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import EXTRACTION_WINDOW_CHARS, EXTRACTION_WINDOW_OVERLAP
+
+def iter_windows(text, size=EXTRACTION_WINDOW_CHARS, overlap=EXTRACTION_WINDOW_OVERLAP):
+    """
+    Yield (start, own_start, own_end, window) over overlapping windows of text.
+    Every position is owned by exactly one window, and a match is kept only by
+    the window that owns its start. Owned boundaries snap back to whitespace
+    so no word is split between two windows.
+    """
+    step = max(size - overlap, 1)
+    own_start = 0
+    while own_start < len(text):
+        own_end = min(own_start + step, len(text))
+        if own_end < len(text):
+            boundary = max(text.rfind(' ', own_start + 1, own_end), text.rfind('\n', own_start + 1, own_end))
+            if boundary > own_start:
+                own_end = boundary
+        start = max(0, own_start - overlap // 2)
+        end = min(len(text), own_end + overlap // 2)
+        yield start, own_start, own_end, text[start:end]
+        own_start = own_end
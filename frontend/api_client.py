@@ -0,0 +1,112 @@
+import requests
+from requests.adapters import HTTPAdapter
+import streamlit as st
+
+# API endpoint
+API_URL = "http://127.0.0.1:5000"
+
+# How long cached responses live, in seconds
+CACHE_TTL = 300
+# How often the corpus version is re-checked, in seconds
+VERSION_TTL = 5
+REQUEST_TIMEOUT = 30
+
+@st.cache_resource
+def get_session():
+    """Shared HTTP session so requests reuse pooled keep-alive connections"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def get(path, **kwargs):
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    return get_session().get(f"{API_URL}{path}", **kwargs)
+
+def post(path, **kwargs):
+    # Uploads run the whole pipeline, so they get no timeout by default
+    return get_session().post(f"{API_URL}{path}", **kwargs)
+
+@st.cache_data(ttl=VERSION_TTL, show_spinner=False)
+def get_corpus_version():
+    """Current corpus version; every cached listing below is keyed on it"""
+    response = get("/documents/version")
+    if response.status_code == 200:
+        return response.json()["version"]
+    return None
+
+def invalidate():
+    """Force the next call to see the latest corpus version"""
+    get_corpus_version.clear()
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _fetch_documents(version):
+    response = get("/documents", params={"include_text": "false"})
+    if response.status_code == 200:
+        return response.json()["documents"]
+    return []
+
+def list_documents():
+    """Document listing without text, cached per corpus version"""
+    return _fetch_documents(get_corpus_version())
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _fetch_document_page(limit, offset, version):
+    response = get("/documents", params={"include_text": "false", "limit": limit, "offset": offset})
+    if response.status_code == 200:
+        data = response.json()
+        return data["documents"], data["total"]
+    return [], 0
+
+def list_documents_page(limit, offset=0):
+    """One page of the document listing without text, as (documents, total)"""
+    return _fetch_document_page(limit, offset, get_corpus_version())
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _fetch_document_text(doc_id, version):
+    response = get(f"/documents/{doc_id}/text")
+    if response.status_code == 200:
+        return response.json()["text"]
+    return None
+
+def get_document_text(doc_id):
+    """Full text of a single document"""
+    return _fetch_document_text(doc_id, get_corpus_version())
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _fetch_related(doc_id, limit, version):
+    response = get(f"/related/{doc_id}", params={"limit": limit})
+    if response.status_code == 200:
+        return response.json().get("related", [])
+    return None
+
+def get_related(doc_id, limit=5):
+    """Related documents, or None if the request failed"""
+    return _fetch_related(doc_id, limit, get_corpus_version())
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _fetch_analytics(name, version):
+    response = get(f"/analytics/{name}")
+    if response.status_code == 200:
+        return response.json()
+    return None
+
+def get_analytics(name):
+    """Payload of one /analytics/<name> endpoint"""
+    return _fetch_analytics(name, get_corpus_version())
+
+def search(query, limit=10, doc_type=None):
+    params = {"q": query, "limit": limit}
+    if doc_type:
+        params["type"] = doc_type
+    response = get("/search", params=params)
+    if response.status_code == 200:
+        return response.json().get("results", [])
+    return None
+
+def upload(uploaded_file):
+    response = post("/upload", files={"file": uploaded_file})
+    if response.status_code == 200:
+        invalidate()
+    return response
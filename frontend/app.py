@@ -1,18 +1,18 @@
 import streamlit as st
-import requests
 import pandas as pd
 import plotly.express as px
 import base64
 from io import BytesIO
 import matplotlib.pyplot as plt
-from wordcloud import WordCloud
 import networkx as nx
 
-# API endpoint
-API_URL = "http://127.0.0.1:5000"
+import api_client
 
 st.set_page_config(page_title="AI Document Manager", layout="wide")
 
+# Documents per page in the relationship network selector
+DOCUMENT_PAGE_SIZE = 100
+
 # Initialize session state
 if 'documents' not in st.session_state:
     st.session_state.documents = []
@@ -23,11 +23,9 @@ if 'current_doc' not in st.session_state:
 st.sidebar.title("AI Document Manager")
 menu = st.sidebar.selectbox("Navigation", ["Upload", "Document Explorer", "Search", "Analytics"])
 
-# Refresh documents list
+# Refresh documents list (served from cache until the corpus version changes)
 def load_documents():
-    response = requests.get(f"{API_URL}/documents")
-    if response.status_code == 200:
-        st.session_state.documents = response.json()["documents"]
+    st.session_state.documents = api_client.list_documents()
 
 # Upload functionality
 if menu == "Upload":
@@ -38,8 +36,7 @@ if menu == "Upload":
     if uploaded_file is not None:
         if st.button("Process Document"):
             with st.spinner("Processing document..."):
-                files = {"file": uploaded_file}
-                response = requests.post(f"{API_URL}/upload", files=files)
+                response = api_client.upload(uploaded_file)
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -117,15 +114,19 @@ elif menu == "Document Explorer":
                     st.write("**Extracted Entities:**")
                     st.dataframe(entities_df)
             
-            # Document text preview
+            # Document text preview, fetched only once asked for
             with st.expander("Document Text Preview"):
-                st.text(selected_doc["text"])
+                if st.checkbox("Load full text", key=f"load_text_{doc_id}"):
+                    text = api_client.get_document_text(doc_id)
+                    if text is not None:
+                        st.text(text)
+                    else:
+                        st.error("Could not load document text.")
             
             # Related documents
             with st.expander("Related Documents"):
-                response = requests.get(f"{API_URL}/related/{doc_id}")
-                if response.status_code == 200:
-                    related = response.json().get("related", [])
+                related = api_client.get_related(doc_id)
+                if related is not None:
                     if related:
                         for rel in related:
                             rel_doc = rel["document"]
@@ -142,14 +143,13 @@ elif menu == "Search":
     st.title("Semantic Document Search")
     
     query = st.text_input("Enter your search query:")
+    doc_type = st.selectbox("Document type:", ["All", "Invoice", "Contract", "Resume", "Medical", "Legal", "Financial", "General"])
     
     if query:
         with st.spinner("Searching..."):
-            response = requests.get(f"{API_URL}/search", params={"q": query})
+            results = api_client.search(query, doc_type=None if doc_type == "All" else doc_type)
             
-            if response.status_code == 200:
-                results = response.json().get("results", [])
-                
+            if results is not None:
                 if results:
                     st.write(f"Found {len(results)} results:")
                     
@@ -178,10 +178,12 @@ elif menu == "Search":
 elif menu == "Analytics":
     st.title("Document Analytics")
     
-    # Refresh documents
-    load_documents()
+    # All artifacts are computed and cached server-side per corpus version
+    dashboard = api_client.get_analytics("dashboard")
     
-    if not st.session_state.documents:
+    if dashboard is None:
+        st.error("Could not load analytics.")
+    elif not dashboard["total_documents"]:
         st.info("No documents available. Please upload some documents first.")
     else:
         col1, col2 = st.columns(2)
@@ -189,40 +191,25 @@ elif menu == "Analytics":
         # Document type distribution
         with col1:
             st.subheader("Document Type Distribution")
-            doc_types = [d["type"] for d in st.session_state.documents]
-            type_counts = pd.Series(doc_types).value_counts()
-            fig = px.pie(values=type_counts.values, names=type_counts.index)
+            type_stats = dashboard["document_types"]
+            fig = px.pie(values=type_stats["values"], names=type_stats["labels"])
             st.plotly_chart(fig)
         
         # Entity type distribution
         with col2:
             st.subheader("Entity Type Distribution")
-            all_entities = []
-            for doc in st.session_state.documents:
-                for entity in doc["metadata"]["entities"]:
-                    all_entities.append(entity["type"])
+            entity_stats = dashboard["entity_distribution"]
             
-            if all_entities:
-                entity_counts = pd.Series(all_entities).value_counts()
-                fig = px.bar(x=entity_counts.index, y=entity_counts.values)
+            if entity_stats["labels"]:
+                fig = px.bar(x=entity_stats["labels"], y=entity_stats["values"])
                 st.plotly_chart(fig)
             else:
                 st.info("No entities found in documents.")
         
-        # Word cloud
+        # Word cloud, rendered by the backend
         st.subheader("Document Keyword Cloud")
-        all_keywords = []
-        for doc in st.session_state.documents:
-            all_keywords.extend(doc["metadata"]["key_terms"])
-        
-        if all_keywords:
-            # Generate word cloud
-            wordcloud = WordCloud(width=800, height=400, background_color='white').generate(" ".join(all_keywords))
-            
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.imshow(wordcloud, interpolation='bilinear')
-            ax.axis('off')
-            st.pyplot(fig)
+        if dashboard["wordcloud_png"]:
+            st.image(BytesIO(base64.b64decode(dashboard["wordcloud_png"])), use_column_width=True)
         else:
             st.info("No keywords available for visualization.")
             
@@ -230,37 +217,35 @@ elif menu == "Analytics":
         st.subheader("Document Relationship Network")
         st.write("Select a document to see relationships:")
         
-        doc_options = {f"{d['id']}: {d['filename']}": d["id"] for d in st.session_state.documents}
+        # Documents are paged in from the listing rather than shipped with the dashboard
+        page_count = max(1, -(-dashboard["total_documents"] // DOCUMENT_PAGE_SIZE))
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1) if page_count > 1 else 1
+        page_documents, _ = api_client.list_documents_page(DOCUMENT_PAGE_SIZE, (page - 1) * DOCUMENT_PAGE_SIZE)
+        doc_options = {f"{d['id']}: {d['filename']}": d["id"] for d in page_documents}
         selected = st.selectbox("Choose document:", options=list(doc_options.keys()))
         
         if selected:
             selected_id = doc_options[selected]
-            response = requests.get(f"{API_URL}/related/{selected_id}")
+            graph = api_client.get_analytics(f"relationship-graph/{selected_id}")
             
-            if response.status_code == 200:
-                related = response.json().get("related", [])
-                
-                if related:
-                    # Create network graph
+            if graph is not None:
+                if graph["edges"]:
+                    # Build the graph from the server's precomputed layout
                     G = nx.Graph()
+                    pos = {}
+                    for node in graph["nodes"]:
+                        G.add_node(node["filename"], type=node["type"])
+                        pos[node["filename"]] = (node["x"], node["y"])
                     
-                    # Add central node
-                    central_doc = st.session_state.documents[selected_id]
-                    G.add_node(central_doc["filename"], type=central_doc["type"])
-                    
-                    # Add related nodes
-                    for rel in related:
-                        rel_doc = rel["document"]
-                        similarity = rel["similarity"]
-                        G.add_node(rel_doc["filename"], type=rel_doc["type"])
-                        G.add_edge(central_doc["filename"], rel_doc["filename"], 
-                                  weight=similarity, label=f"{similarity:.2f}")
+                    filenames = {node["id"]: node["filename"] for node in graph["nodes"]}
+                    central_doc = next(n for n in graph["nodes"] if n["id"] == graph["center"])
+                    for edge in graph["edges"]:
+                        G.add_edge(filenames[edge["source"]], filenames[edge["target"]],
+                                  weight=edge["similarity"], label=f"{edge['similarity']:.2f}")
                     
                     # Visualization
                     fig, ax = plt.subplots(figsize=(10, 8))
                     
-                    pos = nx.spring_layout(G)
-                    
                     # Draw nodes colored by document type
                     node_colors = [0 if G.nodes[n]["type"] == central_doc["type"] else 1 
                                  for n in G.nodes()]